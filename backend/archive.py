@@ -0,0 +1,130 @@
+# archive.py
+# Moves inactive students, with their vaccinations, and drives older than
+# ARCHIVE_DRIVE_HORIZON_DAYS into the *_archive tables (see models.py), so the hot
+# tables and their indexes only hold what the day-to-day screens read. Archived rows
+# are still returned by the student and drive detail views, and the drive list, when
+# the request passes include_archived=true.
+#
+# Rows move in batches of --batch-size, each copied and deleted in its own
+# transaction, so the job can run during school hours. A drive is archived only once
+# no vaccination in the hot table refers to it.
+#
+#   python archive.py
+#   python archive.py --drive-horizon-days 365 --dry-run
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, insert, delete, exists, func, literal
+
+from models import ArchivedStudent, ArchivedVaccination, ArchivedVaccinationDrive
+from queries import students, vaccinations, drives
+
+def _copy_columns(table):
+    return [column.name for column in table.columns]
+
+def _archive_batch(db, source, archive, key, ids, archived_at):
+    columns = _copy_columns(source)
+    db.session.execute(insert(archive).from_select(
+        columns + ['archived_at'],
+        select(*[source.c[name] for name in columns], literal(archived_at, archive.c.archived_at.type))
+            .where(source.c[key].in_(ids))
+    ))
+
+def archive(db, drive_horizon_days, batch_size=1000, dry_run=False):
+    """Archive inactive students and old drives. Returns the number of rows moved per table."""
+    archived_at = datetime.utcnow()
+    counts = {'students': 0, 'vaccinations': 0, 'drives': 0}
+    student_archive = ArchivedStudent.__table__
+    vaccination_archive = ArchivedVaccination.__table__
+    drive_archive = ArchivedVaccinationDrive.__table__
+
+    # The row with the highest id stays: SQLite, and MySQL before 8.0 after a restart,
+    # would hand its id out again to the next insert.
+    last_student = db.session.scalar(select(func.max(students.c.student_id)))
+    last_drive = db.session.scalar(select(func.max(drives.c.drive_id)))
+    last_vaccination = db.session.scalar(select(func.max(vaccinations.c.vaccination_id)))
+    keeps_last_vaccination = select(vaccinations.c.student_id)\
+        .where(vaccinations.c.vaccination_id == last_vaccination).scalar_subquery()
+
+    # An empty table has nothing to archive, and no max id to compare against
+    inactive = select(students.c.student_id)\
+        .where(students.c.is_active == False, students.c.student_id < (last_student or 0))
+    if last_vaccination is not None:
+        inactive = inactive.where(students.c.student_id != keeps_last_vaccination)
+    cutoff = archived_at.date() - timedelta(days=drive_horizon_days)
+    old_drives = select(drives.c.drive_id).where(
+        drives.c.drive_date < cutoff,
+        drives.c.drive_id < (last_drive or 0),
+        ~exists().where(vaccinations.c.drive_id == drives.c.drive_id)
+    )
+
+    if dry_run:
+        if last_student is not None:
+            counts['students'] = db.session.scalar(select(func.count()).select_from(inactive.subquery())) or 0
+            counts['vaccinations'] = db.session.scalar(select(func.count()).select_from(vaccinations)
+                                                       .where(vaccinations.c.student_id.in_(inactive))) or 0
+        if last_drive is not None:
+            # Counting the drives that only archived students' vaccinations refer to, too
+            old_drives = select(drives.c.drive_id).where(
+                drives.c.drive_date < cutoff,
+                drives.c.drive_id < last_drive,
+                ~exists().where(vaccinations.c.drive_id == drives.c.drive_id,
+                                vaccinations.c.student_id.not_in(inactive))
+            )
+            counts['drives'] = db.session.scalar(select(func.count()).select_from(old_drives.subquery())) or 0
+        db.session.rollback()
+        return counts
+
+    while last_student is not None:
+        ids = db.session.scalars(inactive.order_by(students.c.student_id).limit(batch_size)).all()
+        if not ids:
+            break
+        _archive_batch(db, vaccinations, vaccination_archive, 'student_id', ids, archived_at)
+        _archive_batch(db, students, student_archive, 'student_id', ids, archived_at)
+        counts['vaccinations'] += db.session.execute(
+            delete(vaccinations).where(vaccinations.c.student_id.in_(ids))).rowcount
+        counts['students'] += db.session.execute(delete(students).where(students.c.student_id.in_(ids))).rowcount
+        db.session.commit()
+
+    # After the students: drives whose last vaccinations were just archived qualify now
+    while last_drive is not None:
+        ids = db.session.scalars(old_drives.order_by(drives.c.drive_id).limit(batch_size)).all()
+        if not ids:
+            break
+        _archive_batch(db, drives, drive_archive, 'drive_id', ids, archived_at)
+        counts['drives'] += db.session.execute(delete(drives).where(drives.c.drive_id.in_(ids))).rowcount
+        db.session.commit()
+
+    db.session.commit()
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description='Move inactive students and old drives into the archive tables')
+    parser.add_argument('--database-url', help='defaults to DATABASE_URL')
+    parser.add_argument('--drive-horizon-days', type=int, help='defaults to ARCHIVE_DRIVE_HORIZON_DAYS')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--dry-run', action='store_true', help='only count what would be archived')
+    args = parser.parse_args()
+
+    # The app reads its configuration at import time
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    from app import create_app
+    from models import db
+    app = create_app()
+
+    with app.app_context():
+        db.create_all()
+        horizon = args.drive_horizon_days
+        if horizon is None:
+            horizon = app.config['ARCHIVE_DRIVE_HORIZON_DAYS']
+        started = time.perf_counter()
+        counts = archive(db, horizon, args.batch_size, args.dry_run)
+        print(f"{'Would archive' if args.dry_run else 'Archived'} {counts['students']} students, "
+              f"{counts['vaccinations']} vaccinations and {counts['drives']} drives older than {horizon} days "
+              f'in {time.perf_counter() - started:.1f}s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+# asgi.py
+# Optional async deployment mode. The hot read endpoints and mark_vaccinated are
+# served from an async SQLAlchemy engine (asyncmy for MySQL), every other route
+# falls through to the regular Flask app. So do requests with query parameters the
+# async handlers do not implement, e.g. ?updated_since= delta sync or ?limit= paging.
+# mark_vaccinated writes outside the Flask session, so it notifies the Flask app's
+# replica router and in-process indexes itself, as RoutingSession does on commit.
+#
+#   uvicorn asgi:application --host 0.0.0.0 --port 5000 --workers 4
+import json
+import math
+import re
+import time
+from datetime import datetime
+from urllib.parse import parse_qs
+
+from asgiref.wsgi import WsgiToAsgi
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import select, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine
+from werkzeug.http import dump_cookie
+
+import config
+from app import create_app
+from helpers import AUTHORIZED_TOKEN, encode_sync_token
+from routing import STICKY_COOKIE, WRITE_LISTENERS
+from queries import (students, vaccinations, vaccination_keys, drives, student_list_statements,
+                     serialize_student_list, drive_list_statement, serialize_drive_list, active_student_count,
+                     vaccinated_student_count, upcoming_drives)
+
+CORS_ORIGINS = ["http://localhost:3000"]
+
+_engine = None
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        options = {}
+        if not config.ASYNC_DATABASE_URI.startswith('sqlite'):
+            options = {
+                'pool_size': config.DB_POOL_SIZE,
+                'max_overflow': config.DB_MAX_OVERFLOW,
+                'pool_timeout': config.DB_POOL_TIMEOUT,
+                'pool_recycle': config.DB_POOL_RECYCLE,
+                'pool_pre_ping': config.DB_POOL_PRE_PING,
+            }
+        _engine = create_async_engine(config.ASYNC_DATABASE_URI, **options)
+    return _engine
+
+# Async endpoints
+async def get_dashboard_data(request, school_id):
+    async with get_engine().connect() as conn:
+        total_students = await conn.scalar(active_student_count(school_id))
+        vaccinated_students = await conn.scalar(vaccinated_student_count(school_id))
+
+        today = datetime.now().date()
+        future_date = today + relativedelta(days=30)
+        upcoming = await conn.execute(upcoming_drives(school_id, today, future_date))
+        upcoming_drives_data = [{
+            'drive_id': d.drive_id,
+            'drive_date': d.drive_date.isoformat(),
+            'vaccine_name': d.vaccine_name,
+            'available_doses': d.available_doses,
+            'applicable_classes': d.applicable_classes
+        } for d in upcoming]
+
+    vaccinated_percentage = round((vaccinated_students / total_students) * 100, 2) if total_students else 0
+    return 200, {
+        'total_students': total_students,
+        'vaccinated_students': vaccinated_students,
+        'vaccinated_percentage': vaccinated_percentage,
+        'upcoming_drives': upcoming_drives_data,
+    }
+
+async def list_students(request, school_id):
+    students_stmt, vaccinations_stmt = student_list_statements(
+        school_id, request['args'].get('search', ''), request['args'].get('class', ''))
+    sync_token = encode_sync_token(datetime.utcnow())
+    async with get_engine().connect() as conn:
+        student_rows = (await conn.execute(students_stmt)).all()
+        vaccination_rows = await conn.execute(vaccinations_stmt)
+        return 200, serialize_student_list(student_rows, vaccination_rows,
+                                           request['args'].get('vaccination_status', '')), \
+            [('x-sync-token', sync_token)]
+
+async def list_drives(request, school_id):
+    sync_token = encode_sync_token(datetime.utcnow())
+    async with get_engine().connect() as conn:
+        return 200, serialize_drive_list(await conn.execute(drive_list_statement(school_id))), \
+            [('x-sync-token', sync_token)]
+
+async def mark_vaccinated(request, school_id, student_id):
+    data = request['json'] or {}
+    drive_id = data.get('drive_id')
+
+    if not drive_id:
+        return 400, {'message': 'Drive ID is required'}
+
+    try:
+        async with get_engine().begin() as conn:
+            # Verify student and drive belong to the same school
+            student = (await conn.execute(
+                select(students.c.student_id, students.c.student_class)
+                .where(students.c.school_id == school_id, students.c.student_id == student_id)
+            )).first()
+            drive = (await conn.execute(
+                select(drives.c.drive_id, drives.c.vaccine_name, drives.c.applicable_classes)
+                .where(drives.c.school_id == school_id, drives.c.drive_id == drive_id)
+            )).first()
+
+            if not student:
+                return 404, {'message': 'Student not found'}
+            if not drive:
+                return 404, {'message': 'Vaccination drive not found'}
+
+            # Check if student is already vaccinated with this vaccine
+            existing = (await conn.execute(
+                select(vaccination_keys.c.vaccination_id, vaccination_keys.c.drive_id,
+                       vaccination_keys.c.vaccination_date)
+                .where(vaccination_keys.c.student_id == student_id,
+                       vaccination_keys.c.vaccine_name == drive.vaccine_name)
+            )).first()
+
+            if existing:
+                return 400, {
+                    'message': f'Student already vaccinated with {drive.vaccine_name}',
+                    'existing_vaccination': {
+                        'vaccination_id': existing.vaccination_id,
+                        'drive_id': existing.drive_id,
+                        'date': existing.vaccination_date.isoformat()
+                    }
+                }
+
+            # Check if student's class is applicable for this drive
+            if drive.applicable_classes and student.student_class not in drive.applicable_classes.split(','):
+                return 400, {
+                    'message': f'Student class {student.student_class} not eligible for this drive'
+                }
+
+            vaccination_date = datetime.utcnow().date()
+            result = await conn.execute(insert(vaccinations).values(
+                student_id=student_id,
+                drive_id=drive_id,
+                vaccine_name=drive.vaccine_name,
+                vaccinated_status=True,
+                vaccination_date=vaccination_date
+            ))
+    except IntegrityError:
+        # A concurrent request recorded the same vaccine first
+        return 400, {'message': f'Student already vaccinated with {drive.vaccine_name}'}
+
+    return 201, {
+        'message': 'Vaccination recorded successfully',
+        'vaccination': {
+            'vaccination_id': result.inserted_primary_key[0],
+            'student_id': student_id,
+            'drive_id': drive_id,
+            'vaccine_name': drive.vaccine_name,
+            'date': vaccination_date.isoformat()
+        }
+    }, record_write(school_id)
+
+def record_write(school_id):
+    """Tell the Flask app about a committed write, returns the sticky cookie header if any."""
+    with flask_app.app_context():
+        for name in WRITE_LISTENERS:
+            extension = flask_app.extensions.get(name)
+            if extension is not None:
+                extension.record_write(school_id)
+        # Keeps this client's following reads, also those served by Flask, on the primary
+        router = flask_app.extensions.get('replica_router')
+        if router is None or not router.replica_keys():
+            return []
+        until = time.time() + flask_app.config['REPLICA_STICKY_SECONDS']
+        return [('set-cookie', dump_cookie(STICKY_COOKIE, f'{until:.3f}', max_age=math.ceil(until - time.time()),
+                                           httponly=True, samesite='Lax'))]
+
+# (method, path, handler, query parameters it implements). Handlers return
+# (status, payload) or (status, payload, [(header, value)])
+ROUTES = [
+    ('GET', re.compile(r'^/schools/(\d+)/dashboard$'), get_dashboard_data, ()),
+    ('GET', re.compile(r'^/schools/(\d+)/students$'), list_students, ('search', 'class', 'vaccination_status')),
+    ('GET', re.compile(r'^/schools/(\d+)/drives$'), list_drives, ()),
+    ('POST', re.compile(r'^/schools/(\d+)/students/(\d+)/vaccinate$'), mark_vaccinated, ()),
+]
+
+def match_route(method, path, args=()):
+    for route_method, pattern, handler, handled_args in ROUTES:
+        if route_method == method:
+            match = pattern.match(path)
+            if match and set(args) <= set(handled_args):
+                return handler, [int(arg) for arg in match.groups()]
+    return None, None
+
+# ASGI plumbing
+flask_app = create_app()
+flask_application = WsgiToAsgi(flask_app)
+
+async def read_body(receive):
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    return body
+
+async def send_json(send, status, payload, headers):
+    body = json.dumps(payload).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+        ] + headers,
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if _engine is not None:
+                await _engine.dispose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+
+    handler, args = (None, None)
+    if scope['type'] == 'http':
+        query_args = {k: v[0] for k, v in parse_qs(scope['query_string'].decode(), keep_blank_values=True).items()}
+        handler, args = match_route(scope['method'], scope['path'], query_args)
+    if handler is None:
+        return await flask_application(scope, receive, send)
+
+    headers = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in scope['headers']}
+    cors_headers = []
+    if headers.get('origin') in CORS_ORIGINS:
+        cors_headers = [(b'access-control-allow-origin', headers['origin'].encode()), (b'vary', b'Origin'),
+                        (b'access-control-expose-headers', b'X-Sync-Token')]
+
+    if headers.get('authorization') != AUTHORIZED_TOKEN:
+        return await send_json(send, 401, {'message': 'Unauthorized'}, cors_headers)
+
+    request = {
+        'args': query_args,
+        'json': None,
+    }
+    if scope['method'] == 'POST':
+        body = await read_body(receive)
+        try:
+            request['json'] = json.loads(body) if body else None
+        except ValueError:
+            return await send_json(send, 400, {'message': 'Invalid JSON body'}, cors_headers)
+
+    status, payload, *extra_headers = await handler(request, *args)
+    await send_json(send, status, payload, cors_headers + [
+        (name.encode('latin-1'), value.encode('latin-1')) for headers in extra_headers for name, value in headers])
@@ -0,0 +1,95 @@
+# bench_statements.py
+# Microbenchmark for the hot lookups in queries.py: the ORM query API, rebuilt on
+# every call, against the cached lambda statements. Runs against a small seeded
+# in-memory SQLite database so the numbers are dominated by Python-side statement
+# construction and compilation rather than the database.
+#
+#   python bench_statements.py --iterations 5000
+import argparse
+import os
+import random
+import time
+from datetime import date, timedelta
+
+def orm_shapes(db, ids):
+    from models import Student, VaccinationDrive, Vaccination
+    school_id, student_id, drive_id, vaccine_name = ids
+    today = date.today()
+    return {
+        'student_by_id': lambda: Student.query.filter_by(school_id=school_id, student_id=student_id).first(),
+        'drive_by_id': lambda: VaccinationDrive.query.filter_by(school_id=school_id, drive_id=drive_id).first(),
+        'existing_vaccination': lambda: Vaccination.query.filter_by(
+            student_id=student_id, vaccine_name=vaccine_name).first(),
+        'active_student_count': lambda: Student.query.filter_by(school_id=school_id, is_active=True).count(),
+        'vaccinated_student_count': lambda: db.session.query(Student.student_id)
+            .join(Vaccination, Vaccination.student_id == Student.student_id)
+            .filter(Student.school_id == school_id).distinct().count(),
+        'upcoming_drives': lambda: VaccinationDrive.query.filter(
+            VaccinationDrive.school_id == school_id,
+            VaccinationDrive.drive_date >= today,
+            VaccinationDrive.drive_date <= today + timedelta(days=30)).all(),
+    }
+
+def lambda_shapes(db, ids):
+    import queries
+    school_id, student_id, drive_id, vaccine_name = ids
+    today = date.today()
+    return {
+        'student_by_id': lambda: db.session.execute(queries.student_by_id(school_id, student_id)).scalars().first(),
+        'drive_by_id': lambda: db.session.execute(queries.drive_by_id(school_id, drive_id)).scalars().first(),
+        'existing_vaccination': lambda: db.session.execute(
+            queries.existing_vaccination(student_id, vaccine_name)).scalars().first(),
+        'active_student_count': lambda: db.session.scalar(queries.active_student_count(school_id)),
+        'vaccinated_student_count': lambda: db.session.scalar(queries.vaccinated_student_count(school_id)),
+        'upcoming_drives': lambda: db.session.execute(
+            queries.upcoming_drives(school_id, today, today + timedelta(days=30))).all(),
+    }
+
+# Lookups issued by one request of each kind
+REQUESTS = {
+    'mark_vaccinated': ['student_by_id', 'drive_by_id', 'existing_vaccination'],
+    'dashboard': ['active_student_count', 'vaccinated_student_count', 'upcoming_drives'],
+}
+
+def time_shape(db, call, iterations):
+    call()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call()
+        db.session.expunge_all()
+    return (time.perf_counter() - started) / iterations
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the hot lookups with and without cached statements')
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = 'sqlite://'
+    from app import create_app
+    from models import db, Student, Vaccination
+    from generate_data import BatchWriter, InsertLoader, generate
+    app = create_app()
+
+    with app.app_context():
+        db.create_all()
+        with InsertLoader(db.engine, 10000) as loader:
+            generate(BatchWriter(loader, 10000), random.Random(args.seed),
+                     schools=2, students=200, vaccinations=600, years=1)
+        vaccination = Vaccination.query.join(Student).first()
+        ids = (vaccination.student.school_id, vaccination.student_id, vaccination.drive_id,
+               vaccination.vaccine_name)
+
+        shapes = {'orm': orm_shapes(db, ids), 'lambda': lambda_shapes(db, ids)}
+        timings = {kind: {name: time_shape(db, call, args.iterations) for name, call in calls.items()}
+                   for kind, calls in shapes.items()}
+
+    for name in timings['orm']:
+        orm, cached = timings['orm'][name] * 1e6, timings['lambda'][name] * 1e6
+        print(f'{name:26} orm {orm:8.1f} us  lambda {cached:8.1f} us  saved {orm - cached:7.1f} us')
+    for request_name, names in REQUESTS.items():
+        saved = sum(timings['orm'][n] - timings['lambda'][n] for n in names) * 1e6
+        print(f'{request_name:26} saves {saved:7.1f} us per request')
+
+if __name__ == '__main__':
+    main()
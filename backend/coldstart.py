@@ -0,0 +1,71 @@
+# coldstart.py
+# Measures cold-start time in fresh interpreters and fails when the median is over
+# budget, so workers, CLI tools and tests keep booting fast:
+#
+#   python coldstart.py                       # budget from COLD_START_BUDGET_MS
+#   python coldstart.py --runs 10 --budget-ms 800 --importtime
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+import config
+
+PROBE = '''
+import json, time
+started = time.perf_counter()
+from app import create_app
+from models import db
+app = create_app()
+created = time.perf_counter()
+with app.app_context():
+    db.create_all()
+response = app.test_client().get('/schools/1/dashboard', headers={'Authorization': 'school_admin_token'})
+first_request = time.perf_counter()
+print(json.dumps({
+    'create_app_ms': (created - started) * 1000,
+    'first_request_ms': (first_request - created) * 1000,
+    'status': response.status_code,
+}))
+'''
+
+def probe(extra_args=()):
+    env = dict(os.environ, DATABASE_URL='sqlite://')
+    result = subprocess.run([sys.executable, *extra_args, '-c', PROBE], env=env, capture_output=True,
+                            text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+def slowest_imports(stderr, top):
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line[len('import time:'):].split('|', 2)]
+        imports.append((int(cumulative_us), name))
+    return sorted(imports, reverse=True)[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure app cold-start time against a budget')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=config.COLD_START_BUDGET_MS)
+    parser.add_argument('--importtime', action='store_true', help='list the slowest imports')
+    args = parser.parse_args()
+
+    runs = [probe()[0] for _ in range(args.runs)]
+    create_app_ms = statistics.median(r['create_app_ms'] for r in runs)
+    first_request_ms = statistics.median(r['first_request_ms'] for r in runs)
+    print(f'create_app:    median {create_app_ms:8.1f} ms')
+    print(f'first request: median {first_request_ms:8.1f} ms')
+    print(f'budget:               {args.budget_ms:8.1f} ms (create_app)')
+
+    if args.importtime:
+        _, stderr = probe(['-X', 'importtime'])
+        for cumulative_us, name in slowest_imports(stderr, 15):
+            print(f'  {cumulative_us / 1000:8.1f} ms  {name}')
+
+    raise SystemExit(0 if create_app_ms <= args.budget_ms else 1)
+
+if __name__ == '__main__':
+    main()
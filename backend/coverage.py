@@ -0,0 +1,246 @@
+# coverage.py
+# Coverage analytics over per-school bitsets. Every student of a school, active or not,
+# has a bit position, and each vaccine, class and gender value and the active flag is a
+# Python int with the bits of its students set. A coverage query or cross-tab is then a
+# handful of integer AND/OR/NOT operations and bit counts.
+#
+# Queries are expressions such as
+#   class:6 AND gender:Female AND vaccine:MMR AND NOT vaccine:"Hepatitis B"
+# Terms are vaccine:<name>, class:<name>, gender:<name>, active and vaccinated (any
+# vaccine). Operators are NOT, AND and OR, in that order of precedence, with
+# parentheses. Values are matched case-insensitively and quoted when they contain
+# spaces. A value no student has matches nobody.
+#
+# The bitsets are built lazily and caught up from the vaccination and student writes
+# with the delta sync queries (see SchoolIndex in roster.py).
+import re
+import sys
+import time
+from datetime import datetime
+
+from queries import coverage_statements
+from roster import SchoolIndex
+
+FIELDS = ('vaccine', 'class', 'gender')
+ACTIVE = ('active', None)
+
+TOKEN = re.compile(r'\s*(?:(?P<paren>[()])|(?P<field>\w+):(?:"(?P<quoted>[^"]*)"|(?P<value>[^\s()"]+))|(?P<word>\w+))')
+
+def _bitmap(bits, size):
+    data = bytearray(size // 8 + 1)
+    for bit in bits:
+        data[bit >> 3] |= 1 << (bit & 7)
+    return int.from_bytes(data, 'little')
+
+class SchoolCoverage:
+    """Bitsets of one school. Never modified once built."""
+
+    def __init__(self, school_id, positions, bitsets, synced_at):
+        self.school_id = school_id
+        self.positions = positions  # student_id -> bit
+        self.bitsets = bitsets  # (field, value) -> int
+        self.synced_at = synced_at
+        self.checked_at = time.monotonic()
+        self.stale = False
+        self.everyone = (1 << len(positions)) - 1
+        self.vaccinated = 0
+        self.names = {}
+        for (field, value), bits in bitsets.items():
+            if field == 'vaccine':
+                self.vaccinated |= bits
+            if value is not None:
+                self.names[field, value.casefold()] = value
+        self.nbytes = sys.getsizeof(positions) + sum(sys.getsizeof(bits) for bits in bitsets.values()) + \
+            sum(sys.getsizeof(student_id) for student_id in positions)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def bitset(self, field, value):
+        return self.bitsets.get((field, self.names.get((field, value.casefold()))), 0)
+
+    def values(self, field):
+        return sorted(value for key_field, value in self.bitsets if key_field == field)
+
+    def evaluate(self, expression):
+        """The bitset of the students matching a query expression. Raises ValueError."""
+        return _Query(self, expression).parse()
+
+    def coverage(self, query, population=None, include_inactive=False, rows=None, columns=None):
+        base = self.evaluate(population) if population else self.everyone
+        if not include_inactive:
+            base &= self.bitsets.get(ACTIVE, 0)
+        matched = self.evaluate(query)
+        result = _share(base, matched)
+        if rows:
+            result['crosstab'] = {'rows': rows, 'columns': columns, 'cells': {
+                row_value: self._cells(base & self.bitsets[rows, row_value], matched, columns)
+                for row_value in self.values(rows)
+            }}
+        return result
+
+    def _cells(self, base, matched, columns):
+        if not columns:
+            return _share(base, matched)
+        return {value: _share(base & self.bitsets[columns, value], matched) for value in self.values(columns)}
+
+def _share(base, matched):
+    population = base.bit_count()
+    count = (base & matched).bit_count()
+    return {
+        'population': population,
+        'matched': count,
+        'share': round(count / population, 4) if population else None
+    }
+
+def build_bitsets(positions, bitsets, student_rows, vaccine_rows):
+    """Bitsets with the given students' bits replaced by their current values. The
+    inputs are not modified; new students get the next free positions."""
+    positions = dict(positions)
+    vaccines = {}
+    for student_id, vaccine_name in vaccine_rows:
+        vaccines.setdefault(student_id, []).append(vaccine_name)
+
+    changed, members = [], {}
+    for student_id, student_class, gender, is_active in student_rows:
+        bit = positions.setdefault(student_id, len(positions))
+        changed.append(bit)
+        keys = [('class', student_class), ('gender', gender)] + \
+            [('vaccine', vaccine_name) for vaccine_name in vaccines.get(student_id, ())]
+        if is_active:
+            keys.append(ACTIVE)
+        for key in keys:
+            if key is ACTIVE or key[1] is not None:
+                members.setdefault(key, []).append(bit)
+
+    size = len(positions)
+    cleared = ~_bitmap(changed, size)
+    updated = {}
+    for key in bitsets.keys() | members.keys():
+        bits = (bitsets.get(key, 0) & cleared) | _bitmap(members.get(key, ()), size)
+        if bits:
+            updated[key] = bits
+    return positions, updated
+
+class CoverageIndex(SchoolIndex):
+    def __init__(self, app=None, db=None):
+        super().__init__()
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        app.config.setdefault('COVERAGE_INDEX_MAX_MB', 64)
+        app.config.setdefault('COVERAGE_INDEX_TTL', 5.0)
+        app.config.setdefault('SYNC_OVERLAP_SECONDS', 10.0)
+        app.extensions['coverage_index'] = self
+        self.configure(db, app.config['COVERAGE_INDEX_MAX_MB'], app.config['COVERAGE_INDEX_TTL'])
+
+    def _build(self, school_id):
+        synced_at = datetime.utcnow()
+        students_stmt, vaccines_stmt = coverage_statements(school_id)
+        student_rows = self.db.session.execute(students_stmt.order_by(students_stmt.selected_columns.student_id)).all()
+        positions, bitsets = build_bitsets({}, {}, student_rows, self.db.session.execute(vaccines_stmt))
+        return SchoolCoverage(school_id, positions, bitsets, synced_at)
+
+    def _refresh(self, coverage):
+        synced_at = datetime.utcnow()
+        students_stmt, vaccines_stmt = coverage_statements(coverage.school_id, self._since(coverage))
+        student_rows = self.db.session.execute(students_stmt).all()
+        if not student_rows:
+            coverage.synced_at = synced_at
+            coverage.checked_at = time.monotonic()
+            return coverage
+        positions, bitsets = build_bitsets(coverage.positions, coverage.bitsets, student_rows,
+                                           self.db.session.execute(vaccines_stmt))
+        return SchoolCoverage(coverage.school_id, positions, bitsets, synced_at)
+
+class _Query:
+    def __init__(self, coverage, expression):
+        self.coverage = coverage
+        self.tokens = _tokenize(expression)
+        self.position = 0
+
+    def parse(self):
+        if not self.tokens:
+            raise ValueError('Empty query')
+        bits = self._or()
+        if self.position < len(self.tokens):
+            raise ValueError(f'Unexpected {self._describe(self.tokens[self.position])}')
+        return bits
+
+    def _peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _next(self):
+        token = self._peek()
+        if token is None:
+            raise ValueError('Unexpected end of query')
+        self.position += 1
+        return token
+
+    def _keyword(self, keyword):
+        token = self._peek()
+        if token is not None and token[0] == 'word' and token[1].upper() == keyword:
+            self.position += 1
+            return True
+        return False
+
+    def _or(self):
+        bits = self._and()
+        while self._keyword('OR'):
+            bits |= self._and()
+        return bits
+
+    def _and(self):
+        bits = self._not()
+        while self._keyword('AND'):
+            bits &= self._not()
+        return bits
+
+    def _not(self):
+        if self._keyword('NOT'):
+            return self.coverage.everyone & ~self._not()
+        return self._term()
+
+    def _term(self):
+        token = self._next()
+        kind, value = token[0], token[1]
+        if kind == 'paren' and value == '(':
+            bits = self._or()
+            if self._peek() != ('paren', ')'):
+                raise ValueError('Missing closing parenthesis')
+            self.position += 1
+            return bits
+        if kind == 'term':
+            field = value.lower()
+            if field not in FIELDS:
+                raise ValueError(f'Unknown field {value!r}, expected one of {", ".join(FIELDS)}')
+            return self.coverage.bitset(field, token[2])
+        if kind == 'word' and value.lower() == 'active':
+            return self.coverage.bitsets.get(ACTIVE, 0)
+        if kind == 'word' and value.lower() == 'vaccinated':
+            return self.coverage.vaccinated
+        raise ValueError(f'Unexpected {self._describe(token)}')
+
+    @staticmethod
+    def _describe(token):
+        if token[0] == 'term':
+            return f'"{token[1]}:{token[2]}"'
+        return f'"{token[1]}"'
+
+def _tokenize(expression):
+    tokens, position = [], 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = TOKEN.match(expression, position)
+        if match is None:
+            raise ValueError(f'Cannot parse the query at "{expression[position:]}"')
+        if match['paren']:
+            tokens.append(('paren', match['paren']))
+        elif match['field']:
+            value = match['quoted'] if match['quoted'] is not None else match['value']
+            tokens.append(('term', match['field'], value))
+        else:
+            tokens.append(('word', match['word']))
+        position = match.end()
+    return tokens
@@ -0,0 +1,66 @@
+# db_pool.py
+# Connection pool that records checkout waits, and the pool snapshot behind /internal/pool.
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long requests wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._last_wait = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self._timeouts += 1
+            raise
+        waited = time.perf_counter() - start
+        with self._stats_lock:
+            self._checkouts += 1
+            self._total_wait += waited
+            self._last_wait = waited
+            if waited > self._max_wait:
+                self._max_wait = waited
+        return conn
+
+    def wait_stats(self):
+        with self._stats_lock:
+            return {
+                'checkouts': self._checkouts,
+                'timeouts': self._timeouts,
+                'total_wait_ms': round(self._total_wait * 1000, 3),
+                'avg_wait_ms': round(self._total_wait * 1000 / self._checkouts, 3) if self._checkouts else 0,
+                'max_wait_ms': round(self._max_wait * 1000, 3),
+                'last_wait_ms': round(self._last_wait * 1000, 3),
+            }
+
+def pool_status(engine):
+    pool = engine.pool
+    status = {'pool_class': type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': max(pool.overflow(), 0),
+            'max_overflow': pool._max_overflow,
+            'timeout': pool.timeout(),
+        })
+
+    if isinstance(pool, TimedQueuePool):
+        status['wait'] = pool.wait_stats()
+
+    return status
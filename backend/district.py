@@ -0,0 +1,136 @@
+# district.py
+# District rollup behind GET /district/dashboard: the per-school dashboard numbers of
+# every school from four grouped queries, instead of one dashboard call per school.
+#
+# The rollup is kept in memory. A commit that writes to a school marks that school
+# dirty, and the next read reloads only the dirty schools, from the primary. The whole
+# rollup is rebuilt every DISTRICT_DASHBOARD_TTL seconds, which also picks up other
+# workers' writes, when the date changes, after a write that is not tied to one school
+# (such as a new school), and when more than DIRTY_REBUILD_LIMIT schools are dirty.
+import threading
+import time
+from datetime import datetime
+
+from dateutil.relativedelta import relativedelta
+
+from queries import district_dashboard_statements
+
+DIRTY_REBUILD_LIMIT = 50
+
+class Rollup:
+    __slots__ = ('schools', 'totals', 'day', 'built_at', 'generated_at')
+
+    def __init__(self, schools, day, built_at):
+        self.schools = schools  # school_id -> row
+        self.day = day
+        self.built_at = built_at
+        self.generated_at = datetime.utcnow()
+        total_students = sum(row['total_students'] for row in schools.values())
+        vaccinated_students = sum(row['vaccinated_students'] for row in schools.values())
+        self.totals = {
+            'schools': len(schools),
+            'total_students': total_students,
+            'vaccinated_students': vaccinated_students,
+            'vaccinated_percentage': round((vaccinated_students / total_students) * 100, 2) if total_students else 0,
+            'upcoming_drives': sum(row['upcoming_drives'] for row in schools.values())
+        }
+
+class DistrictDashboard:
+    def __init__(self, app=None, db=None):
+        self._lock = threading.Lock()
+        self._rollup = None
+        self._dirty = set()
+        self._invalidated = False
+        self.counts = {'hits': 0, 'builds': 0, 'updates': 0}
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        app.config.setdefault('DISTRICT_DASHBOARD_TTL', 60.0)
+        app.extensions['district_dashboard'] = self
+        self.db = db
+        self.ttl = app.config['DISTRICT_DASHBOARD_TTL']
+
+    def record_write(self, school_id):
+        with self._lock:
+            self._dirty.add(school_id)
+
+    def invalidate(self):
+        # A write not tied to one school, e.g. POST /schools: rebuild on the next read
+        with self._lock:
+            self._invalidated = True
+
+    def rollup(self):
+        # Same window as the per-school dashboard
+        today = datetime.now().date()
+        with self._lock:
+            rollup, dirty, invalidated = self._rollup, self._dirty, self._invalidated
+            self._dirty, self._invalidated = set(), False
+
+        try:
+            if rollup is None or invalidated or rollup.day != today or \
+               time.monotonic() - rollup.built_at >= self.ttl or \
+               len(dirty) > DIRTY_REBUILD_LIMIT or not dirty <= rollup.schools.keys():
+                rollup = Rollup(self._load(today), today, time.monotonic())
+                self._count('builds')
+            elif dirty:
+                schools = dict(rollup.schools)
+                schools.update(self._reload(today, dirty))
+                rollup = Rollup(schools, today, rollup.built_at)
+                self._count('updates')
+            else:
+                self._count('hits')
+                return rollup
+        except Exception:
+            with self._lock:
+                self._dirty |= dirty
+                self._invalidated |= invalidated
+            raise
+
+        with self._lock:
+            self._rollup = rollup
+        return rollup
+
+    def _reload(self, today, school_ids):
+        # From the primary, so replica lag cannot put the numbers from before the
+        # write back into the rollup
+        session = self.db.session()
+        session.info['read_primary'] = True
+        try:
+            return self._load(today, sorted(school_ids))
+        finally:
+            session.info.pop('read_primary', None)
+
+    def _load(self, today, school_ids=None):
+        names, totals, vaccinated, upcoming = (
+            dict(self.db.session.execute(statement).all())
+            for statement in district_dashboard_statements(today, today + relativedelta(days=30), school_ids)
+        )
+        schools = {}
+        for school_id, school_name in names.items():
+            total_students = totals.get(school_id, 0)
+            vaccinated_students = vaccinated.get(school_id, 0)
+            schools[school_id] = {
+                'school_id': school_id,
+                'school_name': school_name,
+                'total_students': total_students,
+                'vaccinated_students': vaccinated_students,
+                'vaccinated_percentage':
+                    round((vaccinated_students / total_students) * 100, 2) if total_students else 0,
+                'upcoming_drives': upcoming.get(school_id, 0)
+            }
+        return schools
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def status(self):
+        with self._lock:
+            rollup, dirty, counts = self._rollup, len(self._dirty), dict(self.counts)
+        return {
+            'schools': len(rollup.schools) if rollup else 0,
+            'age_seconds': round(time.monotonic() - rollup.built_at, 1) if rollup else None,
+            'dirty_schools': dirty,
+            'counts': counts
+        }
@@ -0,0 +1,260 @@
+# generate_data.py
+# Deterministic synthetic data at district scale, loaded through the models in models.py.
+#
+#   python generate_data.py --database-url sqlite:///bench.db --reset
+#   python generate_data.py --schools 500 --students 1000000 --vaccinations 5000000 --seed 7
+#   python generate_data.py --as-of $(date +%F)    # dates relative to today
+#
+# Every date, down to updated_at, is derived from --as-of, so the same arguments load
+# the same rows whatever day the script runs.
+# MySQL loads go through LOAD DATA LOCAL INFILE when the server allows it (local_infile=ON),
+# everything else through batched multi-row INSERTs.
+import argparse
+import csv
+import math
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+import config
+from models import db, School, Student, VaccinationDrive, Vaccination
+
+VACCINES = [
+    'Polio', 'MMR', 'Hepatitis B', 'DTaP', 'Tetanus', 'Varicella',
+    'HPV', 'Typhoid', 'Influenza', 'COVID-19 Booster'
+]
+FIRST_NAMES = [
+    'Aarav', 'Vivaan', 'Aditya', 'Vihaan', 'Arjun', 'Sai', 'Reyansh', 'Krishna', 'Ishaan', 'Rohan',
+    'Ananya', 'Diya', 'Saanvi', 'Aadhya', 'Pari', 'Anika', 'Navya', 'Myra', 'Sara', 'Kiara',
+    'Liam', 'Noah', 'Oliver', 'Emma', 'Olivia', 'Ava', 'Mia', 'Lucas', 'Ethan', 'Zoe'
+]
+LAST_NAMES = [
+    'Sharma', 'Verma', 'Gupta', 'Singh', 'Kumar', 'Patel', 'Reddy', 'Iyer', 'Nair', 'Das',
+    'Mehta', 'Joshi', 'Khan', 'Ali', 'Bose', 'Smith', 'Johnson', 'Brown', 'Garcia', 'Miller'
+]
+SCHOOL_KINDS = [
+    ('Primary School', [str(c) for c in range(1, 6)]),
+    ('High School', [str(c) for c in range(6, 13)]),
+    ('Public School', [str(c) for c in range(1, 13)]),
+]
+AS_OF = date(2025, 6, 30)
+TABLES = [School.__table__, VaccinationDrive.__table__, Student.__table__, Vaccination.__table__]
+
+def split_skewed(rng, total, parts, sigma=0.8):
+    """Split total into parts with log-normally distributed sizes (a few large, many small)."""
+    weights = [rng.lognormvariate(0, sigma) for _ in range(parts)]
+    scale = total / sum(weights)
+    sizes = [int(w * scale) for w in weights]
+    for i in range(total - sum(sizes)):
+        sizes[i % parts] += 1
+    return sizes
+
+class InsertLoader:
+    """Batched executemany, which the MySQL drivers send as multi-row INSERTs."""
+
+    def __init__(self, engine, batch_size):
+        self.engine = engine
+        self.batch_size = batch_size
+
+    def __enter__(self):
+        self.conn = self.engine.connect()
+        if self.engine.dialect.name == 'sqlite':
+            self.conn.exec_driver_sql('PRAGMA synchronous = OFF')
+            self.conn.exec_driver_sql('PRAGMA journal_mode = MEMORY')
+        elif self.engine.dialect.name == 'mysql':
+            self.conn.exec_driver_sql('SET foreign_key_checks = 0')
+            self.conn.exec_driver_sql('SET unique_checks = 0')
+        self.conn.commit()
+        return self
+
+    def write(self, table, rows):
+        with self.conn.begin():
+            self.conn.execute(table.insert(), rows)
+
+    def __exit__(self, *exc):
+        self.conn.close()
+
+class LoadDataLoader(InsertLoader):
+    """Writes each batch to a CSV file and bulk loads it with LOAD DATA LOCAL INFILE."""
+
+    def write(self, table, rows):
+        columns = [c.name for c in table.columns]
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        try:
+            with os.fdopen(fd, 'w', newline='') as f:
+                writer = csv.writer(f, lineterminator='\n')
+                for row in rows:
+                    writer.writerow([_csv_value(row.get(c)) for c in columns])
+            with self.conn.begin():
+                self.conn.exec_driver_sql(
+                    f"LOAD DATA LOCAL INFILE '{path.replace(os.sep, '/')}' INTO TABLE {table.name} "
+                    f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' LINES TERMINATED BY '\\n' "
+                    f"({', '.join(columns)})"
+                )
+        finally:
+            os.remove(path)
+
+def _csv_value(value):
+    if value is None:
+        return '\\N'
+    if value is True or value is False:
+        return int(value)
+    if isinstance(value, datetime):
+        return value.isoformat(' ', 'seconds')
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+class BatchWriter:
+    """Buffers rows per table; parents are always flushed before their children."""
+
+    def __init__(self, loader, batch_size):
+        self.loader = loader
+        self.batch_size = batch_size
+        self.buffers = {table: [] for table in TABLES}
+        self.counts = {table.name: 0 for table in TABLES}
+
+    def add(self, table, row):
+        buffer = self.buffers[table]
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush(upto=table)
+
+    def flush(self, upto=None):
+        for table in TABLES:
+            buffer = self.buffers[table]
+            if buffer:
+                self.loader.write(table, buffer)
+                self.counts[table.name] += len(buffer)
+                self.buffers[table] = []
+            if table is upto:
+                break
+
+def generate(writer, rng, schools, students, vaccinations, years, as_of=AS_OF):
+    first_year = as_of.year - years + 1
+    vaccination_rate = min(1.0, vaccinations / max(students, 1) / len(VACCINES))
+    student_id = 0
+    vaccination_id = 0
+    drive_id = 0
+    loaded_at = datetime(as_of.year, as_of.month, as_of.day)
+
+    for school_id, school_size in enumerate(split_skewed(rng, students, schools), start=1):
+        kind, classes = rng.choice(SCHOOL_KINDS)
+        writer.add(School.__table__, {
+            'school_id': school_id,
+            'school_name': f'{rng.choice(LAST_NAMES)} {kind} #{school_id}',
+            'classes': ','.join(classes),
+        })
+
+        # Drives: most vaccines get one drive per year, every vaccine at least one
+        drives_by_vaccine = {}
+        for year in range(first_year, first_year + years):
+            for vaccine in VACCINES:
+                if rng.random() < 0.6 or (year == first_year + years - 1 and vaccine not in drives_by_vaccine):
+                    drive_id += 1
+                    drive_date = date(year, 1, 1) + timedelta(days=rng.randrange(365))
+                    drives_by_vaccine.setdefault(vaccine, []).append((drive_id, drive_date))
+                    writer.add(VaccinationDrive.__table__, {
+                        'drive_id': drive_id,
+                        'school_id': school_id,
+                        'drive_date': drive_date,
+                        'vaccine_name': vaccine,
+                        'available_doses': rng.randrange(50, 1000),
+                        'applicable_classes': ','.join(classes),
+                        'updated_at': loaded_at,
+                    })
+
+        # Skewed class sizes inside the school
+        for student_class, class_size in zip(classes, split_skewed(rng, school_size, len(classes), sigma=0.4)):
+            birth_year = as_of.year - int(student_class) - 5
+            for _ in range(class_size):
+                student_id += 1
+                writer.add(Student.__table__, {
+                    'student_id': student_id,
+                    'school_id': school_id,
+                    'first_name': rng.choice(FIRST_NAMES),
+                    'last_name': rng.choice(LAST_NAMES),
+                    'date_of_birth': date(birth_year, 1, 1) + timedelta(days=rng.randrange(365)),
+                    'gender': 'Female' if rng.random() < 0.49 else 'Male',
+                    'contact_number': f'9{rng.randrange(10 ** 9):09d}',
+                    'student_class': student_class,
+                    'is_active': rng.random() < 0.97,
+                    'updated_at': loaded_at,
+                })
+
+                for vaccine in VACCINES:
+                    if rng.random() >= vaccination_rate:
+                        continue
+                    vaccination_id += 1
+                    vaccine_drive_id, drive_date = rng.choice(drives_by_vaccine[vaccine])
+                    writer.add(Vaccination.__table__, {
+                        'vaccination_id': vaccination_id,
+                        'student_id': student_id,
+                        'drive_id': vaccine_drive_id,
+                        'vaccine_name': vaccine,
+                        'vaccination_date': drive_date,
+                        'vaccinated_status': rng.random() < 0.95,
+                        'notes': None,
+                        'updated_at': loaded_at,
+                    })
+    writer.flush()
+
+def make_engine(url, method):
+    connect_args = {}
+    if url.startswith('mysql') and method != 'insert':
+        driver_args = {'mysqldb': {'local_infile': 1}, 'pymysql': {'local_infile': True},
+                       'mysqlconnector': {'allow_local_infile': True}}
+        connect_args = driver_args.get(make_url(url).get_driver_name(), {})
+    return create_engine(url, connect_args=connect_args)
+
+def pick_loader(engine, method, batch_size):
+    if method == 'auto':
+        method = 'insert'
+        if engine.dialect.name == 'mysql':
+            with engine.connect() as conn:
+                local_infile = conn.execute(text("SHOW VARIABLES LIKE 'local_infile'")).first()
+            if local_infile and local_infile[1] == 'ON':
+                method = 'load-data'
+    loader_class = LoadDataLoader if method == 'load-data' else InsertLoader
+    return method, loader_class(engine, batch_size)
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic schools, students, drives and vaccinations')
+    parser.add_argument('--database-url', default=config.SQLALCHEMY_DATABASE_URI)
+    parser.add_argument('--schools', type=int, default=50)
+    parser.add_argument('--students', type=int, default=20000)
+    parser.add_argument('--vaccinations', type=int, default=60000, help='approximate target')
+    parser.add_argument('--years', type=int, default=3, help='years of drive history')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--as-of', type=date.fromisoformat, default=AS_OF,
+                        help=f'date the data is generated as of, YYYY-MM-DD (default {AS_OF.isoformat()})')
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--method', choices=['auto', 'insert', 'load-data'], default='auto')
+    parser.add_argument('--reset', action='store_true', help='drop and recreate the tables first')
+    args = parser.parse_args()
+
+    engine = make_engine(args.database_url, args.method)
+    if args.reset:
+        db.metadata.drop_all(engine)
+    db.metadata.create_all(engine)
+
+    method, loader = pick_loader(engine, args.method, args.batch_size)
+    started = time.perf_counter()
+    with loader:
+        writer = BatchWriter(loader, args.batch_size)
+        generate(writer, random.Random(args.seed), args.schools, args.students,
+                 args.vaccinations, args.years, args.as_of)
+    elapsed = time.perf_counter() - started
+
+    total = sum(writer.counts.values())
+    print(f'Loaded with {method} in {elapsed:.1f}s ({math.floor(total / elapsed) if elapsed else total} rows/s)')
+    for name, count in writer.counts.items():
+        print(f'  {name}: {count}')
+
+if __name__ == '__main__':
+    main()
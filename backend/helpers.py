@@ -0,0 +1,35 @@
+# helpers.py
+import base64
+import binascii
+from datetime import datetime
+
+from flask import jsonify
+
+# Helper functions
+def _build_cors_preflight_response():
+    response = jsonify({"message": "Preflight accepted"})
+    response.headers.add("Access-Control-Allow-Origin", "http://localhost:3000")
+    response.headers.add("Access-Control-Allow-Headers", "*")
+    response.headers.add("Access-Control-Allow-Methods", "*")
+    return response
+
+AUTHORIZED_TOKEN = "school_admin_token"
+
+def is_authorized(request):
+    token = request.headers.get('Authorization')
+    return token == AUTHORIZED_TOKEN
+
+# Sync tokens for ?updated_since=: an opaque encoding of the server time the
+# response was read at
+def encode_sync_token(timestamp):
+    return base64.urlsafe_b64encode(timestamp.isoformat().encode()).decode().rstrip('=')
+
+def decode_sync_token(token):
+    try:
+        return datetime.fromisoformat(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode())
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+
+# ?include_archived=true: also look in the *_archive tables (see archive.py)
+def include_archived(request):
+    return request.args.get('include_archived', '').lower() in ('1', 'true', 'yes')
@@ -0,0 +1,217 @@
+# loadsim.py
+# Drive-day load simulation: nurses recording vaccinations while admins refresh the
+# dashboard and the student list. Runs against any local deployment, or against an
+# in-process server with --serve:
+#
+#   python serve.py --workers 4 &
+#   python loadsim.py --nurses 200 --admins 20 --duration 60
+#   python loadsim.py --serve --nurses 50 --admins 5 --duration 30
+#
+# After the run it checks that no (student, vaccine) pair was recorded twice and that
+# the number of vaccinations in the school grew by exactly the number of 201 responses.
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from loadtest import AUTHORIZED_TOKEN, summarize
+
+ROLE_MIX = {
+    'nurse': 'vaccinate=6,student_vaccinations=3,students_search=1',
+    'admin': 'dashboard=3,students=4,drives=1',
+}
+
+class Client:
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url
+        self.timeout = timeout
+
+    def call(self, method, path, payload=None):
+        data = json.dumps(payload).encode() if payload is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method, headers={
+            'Authorization': AUTHORIZED_TOKEN,
+            'Content-Type': 'application/json',
+        })
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                return response.status, json.loads(response.read() or b'null')
+        except urllib.error.HTTPError as e:
+            body = e.read()
+            try:
+                return e.code, json.loads(body or b'null')
+            except ValueError:
+                return e.code, None
+        except (urllib.error.URLError, OSError):
+            return 0, None
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+class Simulation:
+    def __init__(self, client, school_id, students, drives, seed):
+        self.client = client
+        self.school_id = school_id
+        self.students = students
+        self.drives = drives
+        self.seed = seed
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.statuses = {}
+        self.recorded = {}  # (student_id, vaccine_name) -> number of 201 responses
+
+    def request(self, rng, name):
+        school = f'/schools/{self.school_id}'
+        student = rng.choice(self.students)
+        if name == 'vaccinate':
+            eligible = [d for d in self.drives
+                        if not d['applicable_classes'] or student['student_class'] in d['applicable_classes'].split(',')]
+            if not eligible:
+                return None
+            drive = rng.choice(eligible)
+            return 'POST', f"{school}/students/{student['student_id']}/vaccinate", {'drive_id': drive['drive_id']}
+        if name == 'student_vaccinations':
+            return 'GET', f"{school}/students/{student['student_id']}/vaccinations", None
+        if name == 'students_search':
+            return 'GET', f"{school}/students?search={student['last_name'][:3]}", None
+        if name == 'students':
+            return 'GET', f'{school}/students?include_vaccinations=true', None
+        if name == 'dashboard':
+            return 'GET', f'{school}/dashboard', None
+        if name == 'drives':
+            return 'GET', f'{school}/drives', None
+        raise ValueError(f'Unknown endpoint {name}')
+
+    def user(self, user_index, mix, think_time, deadline):
+        rng = random.Random(self.seed * 100003 + user_index)
+        names = list(mix)
+        weights = [mix[n] for n in names]
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            call = self.request(rng, name)
+            if call is None:
+                continue
+            method, path, payload = call
+            started = time.perf_counter()
+            status, body = self.client.call(method, path, payload)
+            took = time.perf_counter() - started
+
+            with self.lock:
+                self.statuses.setdefault(name, {})
+                self.statuses[name][status] = self.statuses[name].get(status, 0) + 1
+                if status == 0 or status >= 500:
+                    self.errors[name] = self.errors.get(name, 0) + 1
+                else:
+                    self.latencies.setdefault(name, []).append(took)
+                if name == 'vaccinate' and status == 201:
+                    key = (body['vaccination']['student_id'], body['vaccination']['vaccine_name'])
+                    self.recorded[key] = self.recorded.get(key, 0) + 1
+
+            if think_time:
+                time.sleep(rng.expovariate(1 / think_time))
+
+def vaccination_pairs(client, school_id):
+    status, students = client.call('GET', f'/schools/{school_id}/students?include_vaccinations=true')
+    if status != 200:
+        raise RuntimeError(f'Could not load students for school {school_id}: HTTP {status}')
+    pairs = [(s['student_id'], v['vaccine_name']) for s in students for v in s['vaccinations']]
+    return students, pairs
+
+def run(args):
+    client = Client(args.base_url, args.timeout)
+    students, before = vaccination_pairs(client, args.school_id)
+    status, drives = client.call('GET', f'/schools/{args.school_id}/drives')
+    if not students or status != 200 or not drives:
+        raise RuntimeError(f'School {args.school_id} needs students and drives (see generate_data.py)')
+
+    sim = Simulation(client, args.school_id, students, drives, args.seed)
+    roles = [('nurse', parse_mix(args.nurse_mix))] * args.nurses + [('admin', parse_mix(args.admin_mix))] * args.admins
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+    with ThreadPoolExecutor(max_workers=len(roles)) as pool:
+        for i, (role, mix) in enumerate(roles):
+            pool.submit(sim.user, i, mix, args.think_time, deadline)
+    elapsed = time.perf_counter() - started
+
+    _, after = vaccination_pairs(client, args.school_id)
+    duplicates = len(after) - len(set(after))
+    double_recorded = sum(1 for count in sim.recorded.values() if count > 1)
+    inserted = sum(sim.recorded.values())
+    server_errors = sum(sim.errors.values())
+    checks = {
+        'no_duplicate_vaccinations': duplicates == 0,
+        'no_pair_recorded_twice': double_recorded == 0,
+        'dose_count_matches_inserts': len(after) - len(before) == inserted,
+        'no_server_errors': server_errors == 0,
+    }
+    return {
+        'users': {'nurses': args.nurses, 'admins': args.admins, 'think_time': args.think_time},
+        'duration': round(elapsed, 1),
+        'endpoints': summarize(sim.latencies, sim.errors, elapsed),
+        'statuses': sim.statuses,
+        'vaccinations': {'before': len(before), 'after': len(after), 'recorded_201': inserted,
+                         'duplicates': duplicates},
+        'checks': checks,
+    }
+
+def serve_in_process(port):
+    from werkzeug.serving import make_server
+    from app import create_app
+    from models import db
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate drive-day load against the API')
+    parser.add_argument('--base-url', default='http://localhost:5000')
+    parser.add_argument('--serve', action='store_true', help='run the app in-process on --port')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--school-id', type=int, default=1)
+    parser.add_argument('--nurses', type=int, default=100)
+    parser.add_argument('--admins', type=int, default=10)
+    parser.add_argument('--nurse-mix', default=ROLE_MIX['nurse'])
+    parser.add_argument('--admin-mix', default=ROLE_MIX['admin'])
+    parser.add_argument('--think-time', type=float, default=1.0, help='mean seconds between a user\'s requests')
+    parser.add_argument('--duration', type=float, default=60)
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the JSON report to this file')
+    args = parser.parse_args()
+
+    server = None
+    if args.serve:
+        server = serve_in_process(args.port)
+        args.base_url = f'http://127.0.0.1:{args.port}'
+
+    try:
+        report = run(args)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    for name, stats in report['endpoints'].items():
+        print(f"{name:22} {stats['requests']:7} req  p50 {stats['p50_ms']:9.2f}  p95 {stats['p95_ms']:9.2f}"
+              f"  p99 {stats['p99_ms']:9.2f} ms  errors {stats['errors']}")
+    print(json.dumps({'vaccinations': report['vaccinations'], 'checks': report['checks']}, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    raise SystemExit(0 if all(report['checks'].values()) else 1)
+
+if __name__ == '__main__':
+    main()
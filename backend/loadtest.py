@@ -0,0 +1,102 @@
+# loadtest.py
+# Closed-loop load test for comparing deployment modes, e.g. sync WSGI vs. ASGI:
+#
+#   python loadtest.py --base-url http://localhost:5000 --clients 500 --label wsgi
+#   python loadtest.py --base-url http://localhost:5001 --clients 500 --label asgi
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+AUTHORIZED_TOKEN = "school_admin_token"
+
+ENDPOINTS = {
+    'dashboard': '/schools/{school_id}/dashboard',
+    'students': '/schools/{school_id}/students',
+    'drives': '/schools/{school_id}/drives',
+}
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def summarize(latencies, errors, elapsed):
+    report = {}
+    for name, values in latencies.items():
+        values = sorted(values)
+        report[name] = {
+            'requests': len(values),
+            'errors': errors.get(name, 0),
+            'rps': round(len(values) / elapsed, 1) if elapsed else 0,
+            'p50_ms': round(percentile(values, 50) * 1000, 2),
+            'p95_ms': round(percentile(values, 95) * 1000, 2),
+            'p99_ms': round(percentile(values, 99) * 1000, 2),
+            'max_ms': round(values[-1] * 1000, 2) if values else 0,
+        }
+    return report
+
+def run(base_url, clients, duration, school_id, endpoint_names, timeout):
+    paths = [(name, ENDPOINTS[name].format(school_id=school_id)) for name in endpoint_names]
+    latencies = {name: [] for name in endpoint_names}
+    errors = {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(client_index):
+        i = client_index
+        while time.perf_counter() < deadline:
+            name, path = paths[i % len(paths)]
+            i += 1
+            req = urllib.request.Request(base_url + path, headers={'Authorization': AUTHORIZED_TOKEN})
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(req, timeout=timeout) as response:
+                    response.read()
+                ok = True
+            except (urllib.error.URLError, OSError):
+                ok = False
+            took = time.perf_counter() - start
+            with lock:
+                if ok:
+                    latencies[name].append(took)
+                else:
+                    errors[name] = errors.get(name, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(client, range(clients)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent read load test')
+    parser.add_argument('--base-url', default='http://localhost:5000')
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--duration', type=float, default=30, help='seconds')
+    parser.add_argument('--school-id', type=int, default=1)
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS))
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--label', default='')
+    parser.add_argument('--output', help='append the JSON result to this file')
+    args = parser.parse_args()
+
+    report = run(args.base_url, args.clients, args.duration, args.school_id,
+                 args.endpoints.split(','), args.timeout)
+    result = {
+        'label': args.label,
+        'base_url': args.base_url,
+        'clients': args.clients,
+        'duration': args.duration,
+        'endpoints': report,
+    }
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, 'a') as f:
+            f.write(json.dumps(result) + '\n')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+# memprofile.py
+# Opt-in per-request memory profiling (MEMORY_PROFILE=1). Requests to the views in
+# MEMORY_PROFILE_VIEWS are wrapped with tracemalloc snapshots; the peak allocation
+# and the lines that allocated the most are appended to a JSON-lines file and kept
+# for /internal/memory-profile. tracemalloc is process-wide, so profiled requests
+# are serialized to keep their numbers apart.
+import json
+import threading
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+
+from flask import g, request
+
+class MemoryProfiler:
+    def __init__(self, app=None):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._recent = deque()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('MEMORY_PROFILE', False)
+        app.config.setdefault('MEMORY_PROFILE_VIEWS', [
+            'students.manage_students', 'students.bulk_upload_students',
+            'reports.get_school_report', 'reports.get_district_report', 'district.get_district_dashboard'
+        ])
+        app.config.setdefault('MEMORY_PROFILE_LOG', 'memory_profile.jsonl')
+        app.config.setdefault('MEMORY_PROFILE_TOP', 10)
+        app.config.setdefault('MEMORY_PROFILE_RECENT', 100)
+        app.config.setdefault('APP_RELEASE', None)
+        app.extensions['memory_profiler'] = self
+
+        if not app.config['MEMORY_PROFILE']:
+            return
+
+        self.enabled = True
+        self.views = set(app.config['MEMORY_PROFILE_VIEWS'])
+        self.log_path = app.config['MEMORY_PROFILE_LOG']
+        self.top = app.config['MEMORY_PROFILE_TOP']
+        self.release = app.config['APP_RELEASE']
+        self._recent = deque(maxlen=app.config['MEMORY_PROFILE_RECENT'])
+        self._filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ]
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def recent(self):
+        return list(self._recent)
+
+    def _before_request(self):
+        if request.endpoint not in self.views:
+            return
+        self._lock.acquire()
+        g.memory_profile = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        g.memory_snapshot = tracemalloc.take_snapshot().filter_traces(self._filters)
+        g.memory_baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        g.memory_start = time.perf_counter()
+
+    def _after_request(self, response):
+        if not g.get('memory_profile'):
+            return response
+        elapsed = time.perf_counter() - g.memory_start
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(self._filters)
+        top_lines = snapshot.compare_to(g.memory_snapshot, 'lineno')[:self.top]
+
+        entry = {
+            'timestamp': datetime.utcnow().isoformat(),
+            'release': self.release,
+            'view': request.endpoint,
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'status': response.status_code,
+            'duration_ms': round(elapsed * 1000, 3),
+            'peak_kib': round((peak - g.memory_baseline) / 1024, 1),
+            'retained_kib': round((current - g.memory_baseline) / 1024, 1),
+            'top_lines': [{
+                'location': f'{stat.traceback[0].filename}:{stat.traceback[0].lineno}',
+                'size_kib': round(stat.size_diff / 1024, 1),
+                'count': stat.count_diff,
+            } for stat in top_lines],
+        }
+        self._recent.append(entry)
+        if self.log_path:
+            with open(self.log_path, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+        return response
+
+    def _teardown_request(self, exc):
+        if g.pop('memory_profile', False):
+            self._lock.release()
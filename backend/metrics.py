@@ -0,0 +1,151 @@
+# metrics.py
+# Per-route request metrics in Prometheus text format. Recording is a few dict and
+# counter updates per request and per SQL statement; the text is only built when
+# /metrics is scraped. Counters are per process, so every gunicorn worker is a
+# separate scrape target.
+#
+# Every statement is also counted by how it used SQLAlchemy's compiled-statement
+# cache (hit, miss, or not cacheable, e.g. raw SQL), so a query shape that keeps
+# recompiling shows up as a falling hit rate.
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.interfaces import CacheStats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+SQL_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+_cache_lock = threading.Lock()
+_cache_stats = {stat: 0 for stat in CacheStats}
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f'{name}_sum{{{labels}}} {self.sum}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class RequestMetrics:
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._requests = {}  # (method, route, status) -> count
+        self._latency = {}  # (method, route) -> Histogram
+        self._sql_count = {}  # (method, route) -> Histogram
+        self._sql_time = {}  # (method, route) -> Histogram
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        app.extensions['request_metrics'] = self
+
+    def _before_request(self):
+        g.metrics_start = time.perf_counter()
+        g.sql_statements = 0
+        g.sql_time = 0.0
+
+    def _after_request(self, response):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        key = (request.method, route)
+
+        with self._lock:
+            status_key = key + (response.status_code,)
+            self._requests[status_key] = self._requests.get(status_key, 0) + 1
+            if key not in self._latency:
+                self._latency[key] = Histogram(LATENCY_BUCKETS)
+                self._sql_count[key] = Histogram(SQL_COUNT_BUCKETS)
+                self._sql_time[key] = Histogram(SQL_TIME_BUCKETS)
+            self._latency[key].observe(elapsed)
+            self._sql_count[key].observe(g.get('sql_statements', 0))
+            self._sql_time[key].observe(g.get('sql_time', 0.0))
+        return response
+
+    def render(self):
+        with self._lock:
+            requests = sorted(self._requests.items())
+            histograms = [
+                ('http_request_duration_seconds', 'Request latency per route', self._latency),
+                ('http_request_sql_statements', 'SQL statements issued per request', self._sql_count),
+                ('http_request_sql_duration_seconds', 'Time spent in SQL per request', self._sql_time),
+            ]
+            lines = [
+                '# HELP http_requests_total Requests per route and status code',
+                '# TYPE http_requests_total counter',
+            ]
+            for (method, route, status), count in requests:
+                lines.append(
+                    f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}'
+                )
+            for name, help_text, series in histograms:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for (method, route), histogram in sorted(series.items()):
+                    lines.extend(histogram.render(name, f'method="{method}",route="{_escape(route)}"'))
+        lines.append('# HELP sqlalchemy_compiled_cache_total Statements by compiled-cache outcome')
+        lines.append('# TYPE sqlalchemy_compiled_cache_total counter')
+        for stat, count in compiled_cache_counts().items():
+            lines.append(f'sqlalchemy_compiled_cache_total{{result="{stat}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_start'] = time.perf_counter()
+
+def compiled_cache_counts():
+    with _cache_lock:
+        return {stat.name.lower(): count for stat, count in _cache_stats.items()}
+
+def statement_cache_status(engine):
+    counts = compiled_cache_counts()
+    lookups = counts['cache_hit'] + counts['cache_miss']
+    cache = engine._compiled_cache
+    return {
+        'size': len(cache) if cache is not None else 0,
+        'capacity': cache.capacity if cache is not None else 0,
+        'statements': counts,
+        'hit_rate': round(counts['cache_hit'] / lookups, 4) if lookups else None,
+    }
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        with _cache_lock:
+            _cache_stats[context.cache_hit] += 1
+    start = conn.info.pop('query_start', None)
+    if start is not None and has_request_context() and 'sql_statements' in g:
+        g.sql_statements += 1
+        g.sql_time += time.perf_counter() - start
@@ -1,7 +1,12 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from sqlalchemy import event, text
 
-db = SQLAlchemy()
+from routing import RoutingSession
+
+# Sessions live for one request, so objects are not expired on commit: building the
+# response from them after commit would otherwise reload every object with a SELECT.
+db = SQLAlchemy(session_options={'class_': RoutingSession, 'expire_on_commit': False})
 
 class School(db.Model):
     __tablename__ = 'schools'
@@ -20,6 +25,7 @@ class Student(db.Model):
     contact_number = db.Column(db.String(50))
     student_class = db.Column(db.String(50))  # Class/grade of the student
     is_active = db.Column(db.Boolean, default=True)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     school = db.relationship('School', backref='students')
     vaccinations = db.relationship('Vaccination', backref='student')
@@ -32,9 +38,22 @@ class VaccinationDrive(db.Model):
     vaccine_name = db.Column(db.String(255), nullable=False)
     available_doses = db.Column(db.Integer, nullable=False)
     applicable_classes = db.Column(db.String(255), nullable=False)  # Comma-separated list
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     school = db.relationship('School', backref='vaccination_drives')
 
+# Tombstones of deleted drives, so drive delta sync can report them
+class DeletedDrive(db.Model):
+    __tablename__ = 'deleted_drives'
+    deletion_id = db.Column(db.Integer, primary_key=True)
+    drive_id = db.Column(db.Integer, nullable=False)  # SQLite can hand a deleted id out again
+    school_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_deleted_drives_school_deleted', 'school_id', 'deleted_at'),
+    )
+
 class Vaccination(db.Model):
     __tablename__ = 'vaccinations'
     vaccination_id = db.Column(db.Integer, primary_key=True)
@@ -44,9 +63,126 @@ class Vaccination(db.Model):
     vaccination_date = db.Column(db.Date, nullable=False, default=datetime.utcnow)
     vaccinated_status = db.Column(db.Boolean, default=False)
     notes = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     drive = db.relationship('VaccinationDrive', backref='vaccinations')
     
     __table_args__ = (
         db.UniqueConstraint('student_id', 'vaccine_name', name='unique_student_vaccine'),
-    )
\ No newline at end of file
+        db.Index('ix_vaccinations_vaccine_date', 'vaccine_name', 'vaccination_date'),  # Coverage time series
+    )
+
+# One row per (student, vaccine) recorded in vaccinations, maintained by the triggers
+# below. Its primary key enforces unique_student_vaccine once vaccinations is
+# partitioned by year (partitions.py), where MySQL only allows unique keys that include
+# vaccination_date, and the duplicate check reads it without visiting every partition.
+class VaccinationKey(db.Model):
+    __tablename__ = 'vaccination_keys'
+    student_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    vaccine_name = db.Column(db.String(255), primary_key=True)
+    vaccination_id = db.Column(db.Integer, nullable=False)
+    drive_id = db.Column(db.Integer, nullable=False)
+    vaccination_date = db.Column(db.Date, nullable=False)
+
+VACCINATION_KEY_TRIGGERS = {
+    'vaccinations_key_insert': ('AFTER INSERT', """
+        INSERT INTO vaccination_keys (student_id, vaccine_name, vaccination_id, drive_id, vaccination_date)
+        VALUES (NEW.student_id, NEW.vaccine_name, NEW.vaccination_id, NEW.drive_id, NEW.vaccination_date)"""),
+    'vaccinations_key_update': ('AFTER UPDATE', """
+        UPDATE vaccination_keys SET student_id = NEW.student_id, vaccine_name = NEW.vaccine_name,
+            vaccination_id = NEW.vaccination_id, drive_id = NEW.drive_id, vaccination_date = NEW.vaccination_date
+        WHERE student_id = OLD.student_id AND vaccine_name = OLD.vaccine_name"""),
+    'vaccinations_key_delete': ('AFTER DELETE', """
+        DELETE FROM vaccination_keys WHERE student_id = OLD.student_id AND vaccine_name = OLD.vaccine_name"""),
+}
+
+@event.listens_for(db.metadata, 'after_create')
+def _install_vaccination_keys(metadata, connection, tables=(), **kw):
+    # Also runs when create_all() adds vaccination_keys to an existing database
+    if VaccinationKey.__table__ not in tables:
+        return
+    connection.execute(text(
+        'INSERT INTO vaccination_keys (student_id, vaccine_name, vaccination_id, drive_id, vaccination_date) '
+        'SELECT student_id, vaccine_name, vaccination_id, drive_id, vaccination_date FROM vaccinations'))
+    for name, (timing, body) in VACCINATION_KEY_TRIGGERS.items():
+        if connection.dialect.name == 'sqlite':
+            body = f'BEGIN {body}; END'
+        connection.execute(text(f'CREATE TRIGGER {name} {timing} ON vaccinations FOR EACH ROW {body}'))
+
+# Archive tables, filled by archive.py: inactive students with their vaccinations and old
+# drives move here so the tables above stay small. Rows keep their ids.
+class ArchivedStudent(db.Model):
+    __tablename__ = 'students_archive'
+    student_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    school_id = db.Column(db.Integer, nullable=False)
+    first_name = db.Column(db.String(255), nullable=False)
+    last_name = db.Column(db.String(255), nullable=False)
+    date_of_birth = db.Column(db.Date)
+    gender = db.Column(db.String(50))
+    contact_number = db.Column(db.String(50))
+    student_class = db.Column(db.String(50))
+    is_active = db.Column(db.Boolean, default=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_students_archive_school_archived', 'school_id', 'archived_at'),  # Delta sync
+    )
+
+class ArchivedVaccinationDrive(db.Model):
+    __tablename__ = 'vaccination_drives_archive'
+    drive_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    school_id = db.Column(db.Integer, nullable=False)
+    drive_date = db.Column(db.Date, nullable=False)
+    vaccine_name = db.Column(db.String(255), nullable=False)
+    available_doses = db.Column(db.Integer, nullable=False)
+    applicable_classes = db.Column(db.String(255), nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_vaccination_drives_archive_school_archived', 'school_id', 'archived_at'),  # Delta sync
+    )
+
+class ArchivedVaccination(db.Model):
+    __tablename__ = 'vaccinations_archive'
+    vaccination_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    student_id = db.Column(db.Integer, nullable=False, index=True)
+    drive_id = db.Column(db.Integer, nullable=False)
+    vaccine_name = db.Column(db.String(255), nullable=False)
+    vaccination_date = db.Column(db.Date, nullable=False)
+    vaccinated_status = db.Column(db.Boolean, default=False)
+    notes = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+# Reporting tables, rebuilt per school by reporting.py from the tables above
+class ReportVaccinationDaily(db.Model):
+    __tablename__ = 'report_vaccinations_daily'
+    report_id = db.Column(db.Integer, primary_key=True)
+    school_id = db.Column(db.Integer, nullable=False)
+    student_class = db.Column(db.String(50))
+    vaccine_name = db.Column(db.String(255), nullable=False)
+    vaccination_date = db.Column(db.Date, nullable=False)
+    vaccinated = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_report_vaccinations_daily_school', 'school_id', 'vaccination_date'),
+    )
+
+class ReportClassSummary(db.Model):
+    __tablename__ = 'report_class_summary'
+    report_id = db.Column(db.Integer, primary_key=True)
+    school_id = db.Column(db.Integer, nullable=False, index=True)
+    student_class = db.Column(db.String(50))
+    active_students = db.Column(db.Integer, nullable=False)
+    vaccinated_students = db.Column(db.Integer, nullable=False)  # Active students with any vaccination
+
+class ReportRefresh(db.Model):
+    __tablename__ = 'report_refreshes'
+    refresh_id = db.Column(db.Integer, primary_key=True)
+    watermark = db.Column(db.DateTime, nullable=False)  # Changes from this time on are not in the reports yet
+    full = db.Column(db.Boolean, nullable=False, default=False)
+    schools = db.Column(db.Integer, nullable=False)
+    rows = db.Column(db.Integer, nullable=False)
+    duration_ms = db.Column(db.Float, nullable=False)
@@ -0,0 +1,106 @@
+# partitions.py
+# Range-partitions vaccinations by YEAR(vaccination_date) on MySQL, so queries bounded
+# by vaccination_date, like the coverage time series, only read the partitions of the
+# years they cover. Every date filter in queries.py compares the bare column, which is
+# what MySQL needs to prune.
+#
+# MySQL only allows unique keys that include the partitioning column, and no foreign
+# keys on partitioned tables. The first run therefore replaces the primary key with
+# (vaccination_id, vaccination_date), and drops unique_student_vaccine and the foreign
+# keys. One vaccination per student and vaccine is then enforced by the primary key of
+# vaccination_keys, which triggers keep in step with vaccinations (see models.py).
+#
+# Later runs add the partitions for the coming years; run it yearly from cron. SQLite
+# has no partitioning: there vaccination_keys and its triggers are all there is.
+#
+#   python partitions.py                       # partition, or add the coming years
+#   python partitions.py --years-ahead 3 --dry-run
+import argparse
+import os
+from datetime import datetime
+
+from sqlalchemy import select, func, text
+
+from queries import vaccinations
+
+OVERFLOW = 'pmax'
+
+def _partition(year):
+    return f'PARTITION p{year} VALUES LESS THAN ({year + 1})'
+
+def _overflow():
+    # Stays empty while the partitions are added ahead of time
+    return f'PARTITION {OVERFLOW} VALUES LESS THAN MAXVALUE'
+
+def existing_partitions(connection):
+    """[(name, upper bound, estimated rows)] of vaccinations, empty if not partitioned."""
+    return connection.execute(text(
+        'SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS FROM information_schema.PARTITIONS '
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'vaccinations' AND PARTITION_NAME IS NOT NULL "
+        'ORDER BY PARTITION_ORDINAL_POSITION')).all()
+
+def partition_statements(connection, last_year):
+    """The DDL that partitions vaccinations through last_year, or adds the missing years."""
+    partitions = existing_partitions(connection)
+    if partitions:
+        bounds = [int(bound) for name, bound, rows in partitions if name != OVERFLOW]
+        years = range(max(bounds), last_year + 1)
+        if not years:
+            return []
+        return [f'ALTER TABLE vaccinations REORGANIZE PARTITION {OVERFLOW} INTO '
+                f"({', '.join([_partition(year) for year in years] + [_overflow()])})"]
+
+    first = connection.execute(select(func.min(vaccinations.c.vaccination_date))).scalar()
+    first_year = min(first.year if first else last_year, last_year)
+    foreign_keys = connection.execute(text(
+        'SELECT CONSTRAINT_NAME FROM information_schema.REFERENTIAL_CONSTRAINTS '
+        "WHERE CONSTRAINT_SCHEMA = DATABASE() AND TABLE_NAME = 'vaccinations'")).scalars().all()
+    statements = []
+    if foreign_keys:
+        # Separately: unique_student_vaccine may be the index behind the student_id key
+        statements.append('ALTER TABLE vaccinations ' +
+                          ', '.join(f'DROP FOREIGN KEY {name}' for name in foreign_keys))
+    # The first partition also takes anything older
+    statements.append(
+        'ALTER TABLE vaccinations DROP INDEX unique_student_vaccine, '
+        'ADD INDEX ix_vaccinations_student_vaccine (student_id, vaccine_name), '
+        'DROP PRIMARY KEY, ADD PRIMARY KEY (vaccination_id, vaccination_date) '
+        'PARTITION BY RANGE (YEAR(vaccination_date)) '
+        f"({', '.join([_partition(year) for year in range(first_year, last_year + 1)] + [_overflow()])})"
+    )
+    return statements
+
+def main():
+    parser = argparse.ArgumentParser(description='Partition vaccinations by year, or add the coming years')
+    parser.add_argument('--database-url', help='defaults to DATABASE_URL')
+    parser.add_argument('--years-ahead', type=int, default=1, help='partitions to have beyond the current year')
+    parser.add_argument('--dry-run', action='store_true', help='only print the statements')
+    args = parser.parse_args()
+
+    # The app reads its configuration at import time
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    from app import create_app
+    from models import db
+    app = create_app()
+
+    with app.app_context():
+        # Also creates vaccination_keys, with its triggers, on an existing database
+        db.create_all()
+        if db.engine.dialect.name != 'mysql':
+            print(f'{db.engine.dialect.name} has no table partitioning; '
+                  'unique_student_vaccine is enforced by vaccination_keys')
+            return
+        with db.engine.begin() as connection:
+            statements = partition_statements(connection, datetime.utcnow().year + args.years_ahead)
+            for statement in statements:
+                print(statement)
+                if not args.dry_run:
+                    connection.execute(text(statement))
+            for name, bound, rows in existing_partitions(connection):
+                print(f'{name:>8}  < {bound:<9} ~{rows} rows')
+        if not statements:
+            print('Partitions are up to date')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,330 @@
+# queries.py
+# Core statements for the read paths, shared by the Flask views and the async
+# endpoints in asgi.py. The large lists select only the columns the JSON needs and the
+# rows are serialized straight from the result tuples, so no ORM instances are built
+# and nothing is added to the session's identity map.
+#
+# The hot lookups further down are lambda statements. SQLAlchemy keys them on the
+# lambda's code location, so after the first call the statement is neither rebuilt
+# nor compiled again; the closure variables are extracted as bound parameters.
+from sqlalchemy import select, func, distinct, exists, case, lambda_stmt, or_, Date, String
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from models import (School, Student, Vaccination, VaccinationDrive, DeletedDrive, VaccinationKey, ArchivedStudent, ArchivedVaccination,
+                    ArchivedVaccinationDrive, ReportVaccinationDaily, ReportClassSummary, ReportRefresh)
+
+schools = School.__table__
+students = Student.__table__
+vaccinations = Vaccination.__table__
+vaccination_keys = VaccinationKey.__table__
+drives = VaccinationDrive.__table__
+archived_drives = ArchivedVaccinationDrive.__table__
+report_daily = ReportVaccinationDaily.__table__
+report_classes = ReportClassSummary.__table__
+
+def student_conditions(school_id, search='', student_class=''):
+    conditions = [students.c.school_id == school_id, students.c.is_active == True]
+    if search:
+        conditions.append(or_(
+            students.c.first_name.ilike(f'%{search}%'),
+            students.c.last_name.ilike(f'%{search}%'),
+            students.c.student_id.cast(String).ilike(f'%{search}%')
+        ))
+    if student_class:
+        conditions.append(students.c.student_class == student_class)
+    return conditions
+
+# Columns read by serialize_student_list, in order
+STUDENT_COLUMNS = (
+    students.c.student_id, students.c.first_name, students.c.last_name,
+    students.c.date_of_birth, students.c.gender, students.c.contact_number,
+    students.c.student_class
+)
+STUDENT_VACCINATION_COLUMNS = (
+    vaccinations.c.student_id, vaccinations.c.vaccine_name,
+    vaccinations.c.vaccination_date, vaccinations.c.drive_id
+)
+
+def _student_statements(conditions, *extra_columns):
+    students_stmt = select(*STUDENT_COLUMNS, *extra_columns).where(*conditions)
+    vaccinations_stmt = select(*STUDENT_VACCINATION_COLUMNS)\
+        .where(vaccinations.c.student_id.in_(select(students.c.student_id).where(*conditions)))
+    return students_stmt, vaccinations_stmt
+
+def student_list_statements(school_id, search='', student_class=''):
+    """The students query and one query for all of their vaccinations."""
+    return _student_statements(student_conditions(school_id, search, student_class))
+
+def student_page_statement(school_id, limit, after=0, search='', student_class=''):
+    """Active students ordered by id, `limit` at a time, starting after the id `after`."""
+    return select(*STUDENT_COLUMNS)\
+        .where(*student_conditions(school_id, search, student_class), students.c.student_id > after)\
+        .order_by(students.c.student_id)\
+        .limit(limit)
+
+def student_vaccinations_statement(student_ids):
+    # A plain id list: MySQL does not allow LIMIT inside an IN subquery
+    return select(*STUDENT_VACCINATION_COLUMNS).where(vaccinations.c.student_id.in_(student_ids))
+
+def vaccination_records_statement(school_id, student_ids):
+    """Full vaccination records of the given students of a school."""
+    return select(vaccinations.c.student_id, vaccinations.c.vaccination_id, vaccinations.c.drive_id,
+                  vaccinations.c.vaccine_name, vaccinations.c.vaccination_date, vaccinations.c.vaccinated_status)\
+        .join(students, students.c.student_id == vaccinations.c.student_id)\
+        .where(students.c.school_id == school_id, vaccinations.c.student_id.in_(student_ids))\
+        .order_by(vaccinations.c.student_id, vaccinations.c.vaccination_id)
+
+def student_changed_since(since):
+    # A recorded or changed vaccination counts as a change to its student
+    changed_by_vaccination = select(vaccinations.c.student_id).where(vaccinations.c.updated_at >= since)
+    return or_(students.c.updated_at >= since, students.c.student_id.in_(changed_by_vaccination))
+
+def student_changes_statements(school_id, since):
+    """Students changed since `since`, active or not. is_active is selected as an extra column."""
+    return _student_statements([students.c.school_id == school_id, student_changed_since(since)],
+                               students.c.is_active)
+
+def archived_students_since(school_id, since):
+    """Ids of the school's students archived since `since`: gone from students, so
+    delta sync reports them with the deactivated ones."""
+    return lambda_stmt(lambda: select(ArchivedStudent.student_id).where(ArchivedStudent.school_id == school_id,
+                                                                        ArchivedStudent.archived_at >= since))
+
+def schools_changed_since(since):
+    """Schools with students changed or archived since `since`."""
+    return select(students.c.school_id).where(student_changed_since(since))\
+        .union(select(ArchivedStudent.school_id).where(ArchivedStudent.archived_at >= since))
+
+def serialize_student_list(student_rows, vaccination_rows, vaccination_status=''):
+    vaccinations_by_student = {}
+    for student_id, vaccine_name, vaccination_date, drive_id in vaccination_rows:
+        vaccinations_by_student.setdefault(student_id, []).append({
+            'vaccine_name': vaccine_name,
+            'vaccination_date': vaccination_date.isoformat(),
+            'drive_id': drive_id
+        })
+
+    student_list = []
+    for student_id, first_name, last_name, date_of_birth, gender, contact_number, student_class in student_rows:
+        student_vaccinations = vaccinations_by_student.get(student_id, [])
+        if not vaccination_status or \
+           (vaccination_status == 'vaccinated' and student_vaccinations) or \
+           (vaccination_status == 'not_vaccinated' and not student_vaccinations):
+            student_list.append({
+                'student_id': student_id,
+                'first_name': first_name,
+                'last_name': last_name,
+                'date_of_birth': date_of_birth.isoformat() if date_of_birth else None,
+                'gender': gender,
+                'contact_number': contact_number,
+                'student_class': student_class,
+                'vaccinations': student_vaccinations
+            })
+    return student_list
+
+def coverage_statements(school_id, since=None):
+    """Class, gender and active flag of every student of a school, active or not, and the
+    names of their vaccines. With `since`, only the students changed since then."""
+    conditions = [students.c.school_id == school_id]
+    if since is not None:
+        conditions.append(student_changed_since(since))
+    students_stmt = select(students.c.student_id, students.c.student_class, students.c.gender,
+                           students.c.is_active).where(*conditions)
+    vaccines_stmt = select(vaccinations.c.student_id, vaccinations.c.vaccine_name)\
+        .where(vaccinations.c.student_id.in_(select(students.c.student_id).where(*conditions)))
+    return students_stmt, vaccines_stmt
+
+def has_vaccination():
+    # Correlated to students only, so it also works in queries that join vaccinations
+    return exists().where(vaccinations.c.student_id == students.c.student_id).correlate(students)
+
+def vaccination_status_condition(vaccination_status):
+    if vaccination_status == 'vaccinated':
+        return has_vaccination()
+    if vaccination_status == 'not_vaccinated':
+        return ~has_vaccination()
+    return None
+
+def student_facet_statements(school_id, search='', student_class='', vaccination_status=''):
+    """Grouped counts for the student list filters. Each facet applies every filter
+    except its own, so the options of a dropdown do not collapse to the selected one."""
+    base = student_conditions(school_id, search)
+    class_condition = [students.c.student_class == student_class] if student_class else []
+    status_condition = vaccination_status_condition(vaccination_status)
+    status_condition = [status_condition] if status_condition is not None else []
+
+    classes = select(students.c.student_class, func.count())\
+        .where(*base, *status_condition)\
+        .group_by(students.c.student_class)
+    vaccines = select(vaccinations.c.vaccine_name, func.count(distinct(students.c.student_id)))\
+        .select_from(students.join(vaccinations, vaccinations.c.student_id == students.c.student_id))\
+        .where(*base, *class_condition, *status_condition)\
+        .group_by(vaccinations.c.vaccine_name)
+    status = select(func.count(), func.count(case((has_vaccination(), 1))))\
+        .where(*base, *class_condition)
+    return classes, vaccines, status
+
+class week_start(FunctionElement):
+    """The Monday of the week a date falls in."""
+    type = Date()
+    inherit_cache = True
+
+@compiles(week_start)
+def _week_start(element, compiler, **kw):
+    day = compiler.process(element.clauses, **kw)
+    return f'DATE_SUB({day}, INTERVAL WEEKDAY({day}) DAY)'
+
+@compiles(week_start, 'sqlite')
+def _week_start_sqlite(element, compiler, **kw):
+    return f"date({compiler.process(element.clauses, **kw)}, 'weekday 0', '-6 days')"
+
+def coverage_series_statement(school_id, vaccine_name, bucket, start=None, end=None):
+    """Vaccinations of one vaccine per day or week with the running total, for a school
+    or, with school_id None, the district. Reads the (vaccine_name, vaccination_date) index."""
+    period = vaccinations.c.vaccination_date
+    if bucket == 'week':
+        period = week_start(period)
+    period = period.label('period')
+    source = vaccinations
+    conditions = [vaccinations.c.vaccine_name == vaccine_name]
+    if school_id is not None:
+        source = vaccinations.join(students, students.c.student_id == vaccinations.c.student_id)
+        conditions.append(students.c.school_id == school_id)
+    if start is not None:
+        conditions.append(vaccinations.c.vaccination_date >= start)
+    if end is not None:
+        conditions.append(vaccinations.c.vaccination_date <= end)
+    counts = select(period, func.count().label('vaccinated')).select_from(source)\
+        .where(*conditions).group_by(period).subquery()
+    return select(counts.c.period, counts.c.vaccinated,
+                  func.sum(counts.c.vaccinated).over(order_by=counts.c.period).label('cumulative'))\
+        .order_by(counts.c.period)
+
+def drive_list_statement(school_id):
+    return select(
+        drives.c.drive_id, drives.c.drive_date, drives.c.vaccine_name,
+        drives.c.available_doses, drives.c.applicable_classes, drives.c.school_id
+    ).where(drives.c.school_id == school_id)
+
+def archived_drive_list_statement(school_id):
+    """Same columns as drive_list_statement, from the archive, to UNION ALL with it."""
+    return select(
+        archived_drives.c.drive_id, archived_drives.c.drive_date, archived_drives.c.vaccine_name,
+        archived_drives.c.available_doses, archived_drives.c.applicable_classes, archived_drives.c.school_id
+    ).where(archived_drives.c.school_id == school_id)
+
+def active_drives_statement(school_id, today):
+    return drive_list_statement(school_id).where(drives.c.drive_date >= today).order_by(drives.c.drive_date)
+
+def drive_changes_statement(school_id, since):
+    return drive_list_statement(school_id).where(drives.c.updated_at >= since)
+
+def drives_removed_since(school_id, since):
+    """Ids of the school's drives deleted or archived since `since`."""
+    deleted_drives = DeletedDrive.__table__
+    return select(deleted_drives.c.drive_id)\
+        .where(deleted_drives.c.school_id == school_id, deleted_drives.c.deleted_at >= since)\
+        .union_all(select(archived_drives.c.drive_id)
+                   .where(archived_drives.c.school_id == school_id, archived_drives.c.archived_at >= since))
+
+def serialize_drive_list(drive_rows):
+    return [{
+        'drive_id': drive_id,
+        'drive_date': drive_date.isoformat(),
+        'vaccine_name': vaccine_name,
+        'available_doses': available_doses,
+        'applicable_classes': applicable_classes,
+        'school_id': school_id  # Added school_id to response
+    } for drive_id, drive_date, vaccine_name, available_doses, applicable_classes, school_id in drive_rows]
+
+def district_dashboard_statements(start, end, school_ids=None):
+    """The dashboard numbers of every school, or of the given ones, grouped by school:
+    names, active students, vaccinated students and drives between start and end."""
+    statements = (
+        select(schools.c.school_id, schools.c.school_name),
+        select(students.c.school_id, func.count())
+            .where(students.c.is_active == True).group_by(students.c.school_id),
+        select(students.c.school_id, func.count(distinct(students.c.student_id)))
+            .select_from(students.join(vaccinations, vaccinations.c.student_id == students.c.student_id))
+            .group_by(students.c.school_id),
+        select(drives.c.school_id, func.count())
+            .where(drives.c.drive_date >= start, drives.c.drive_date <= end).group_by(drives.c.school_id),
+    )
+    if school_ids is None:
+        return statements
+    return tuple(statement.where(statement.selected_columns.school_id.in_(school_ids)) for statement in statements)
+
+def latest_report_refresh():
+    return select(ReportRefresh).order_by(ReportRefresh.refresh_id.desc()).limit(1)
+
+def _report_dates(statement, start, end):
+    if start is not None:
+        statement = statement.where(report_daily.c.vaccination_date >= start)
+    if end is not None:
+        statement = statement.where(report_daily.c.vaccination_date <= end)
+    return statement
+
+def school_report_statements(school_id, start=None, end=None):
+    """Students per class and vaccinations per class and vaccine, from the reporting tables."""
+    return (
+        select(report_classes.c.student_class, report_classes.c.active_students, report_classes.c.vaccinated_students)
+            .where(report_classes.c.school_id == school_id).order_by(report_classes.c.student_class),
+        _report_dates(select(report_daily.c.student_class, report_daily.c.vaccine_name, func.sum(report_daily.c.vaccinated))
+                      .where(report_daily.c.school_id == school_id)
+                      .group_by(report_daily.c.student_class, report_daily.c.vaccine_name), start, end)
+    )
+
+def district_report_statements(start=None, end=None):
+    """Students per school and vaccinations per school and vaccine, from the reporting tables."""
+    return (
+        select(report_classes.c.school_id, func.sum(report_classes.c.active_students),
+               func.sum(report_classes.c.vaccinated_students))
+            .group_by(report_classes.c.school_id).order_by(report_classes.c.school_id),
+        _report_dates(select(report_daily.c.school_id, report_daily.c.vaccine_name, func.sum(report_daily.c.vaccinated))
+                      .group_by(report_daily.c.school_id, report_daily.c.vaccine_name), start, end)
+    )
+
+# Hot lookups
+def archived_student_by_id(school_id, student_id):
+    return lambda_stmt(lambda: select(ArchivedStudent).where(ArchivedStudent.school_id == school_id,
+                                                             ArchivedStudent.student_id == student_id))
+
+def archived_student_vaccinations(student_id):
+    return lambda_stmt(lambda: select(ArchivedVaccination).where(ArchivedVaccination.student_id == student_id))
+
+def archived_drive_by_id(school_id, drive_id):
+    return lambda_stmt(lambda: select(ArchivedVaccinationDrive).where(ArchivedVaccinationDrive.school_id == school_id,
+                                                                      ArchivedVaccinationDrive.drive_id == drive_id))
+
+def student_by_id(school_id, student_id):
+    return lambda_stmt(lambda: select(Student).where(Student.school_id == school_id,
+                                                     Student.student_id == student_id))
+
+def drive_by_id(school_id, drive_id):
+    return lambda_stmt(lambda: select(VaccinationDrive).where(VaccinationDrive.school_id == school_id,
+                                                              VaccinationDrive.drive_id == drive_id))
+
+def existing_vaccination(student_id, vaccine_name):
+    # A primary key lookup, rather than an index probe in every year's partition
+    return lambda_stmt(lambda: select(VaccinationKey).where(VaccinationKey.student_id == student_id,
+                                                            VaccinationKey.vaccine_name == vaccine_name))
+
+def active_student_count(school_id):
+    return lambda_stmt(lambda: select(func.count()).select_from(students)
+                       .where(students.c.school_id == school_id, students.c.is_active == True))
+
+def district_active_student_count():
+    return lambda_stmt(lambda: select(func.count()).select_from(students).where(students.c.is_active == True))
+
+def vaccinated_student_count(school_id):
+    return lambda_stmt(lambda: select(func.count(distinct(students.c.student_id)))
+                       .select_from(students.join(vaccinations, vaccinations.c.student_id == students.c.student_id))
+                       .where(students.c.school_id == school_id))
+
+def upcoming_drives(school_id, start, end):
+    return lambda_stmt(lambda: select(drives.c.drive_id, drives.c.drive_date, drives.c.vaccine_name,
+                                      drives.c.available_doses, drives.c.applicable_classes)
+                       .where(drives.c.school_id == school_id,
+                              drives.c.drive_date >= start,
+                              drives.c.drive_date <= end))
@@ -0,0 +1,97 @@
+# reporting.py
+# Reporting tables (models.ReportVaccinationDaily, ReportClassSummary) that the
+# /reports endpoints read instead of aggregating the live tables during school hours.
+#
+# A refresh finds the schools with students or vaccinations changed since the last
+# refresh's watermark (the updated_at columns used by delta sync), or with students
+# moved to the archive since then, whose vaccinations no longer count. It replaces
+# their report rows with INSERT ... SELECT aggregates in one transaction, so the
+# aggregation runs in the database and readers never see a half-refreshed school. Run
+# it from cron, e.g. nightly:
+#
+#   python reporting.py            # schools changed since the last refresh
+#   python reporting.py --full     # every school
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import select, insert, delete, distinct, func, case, and_
+
+from models import ReportRefresh
+from queries import (students, vaccinations, report_daily, report_classes, has_vaccination, schools_changed_since,
+                     latest_report_refresh)
+
+def refresh_reports(db, full=False):
+    """Bring the reporting tables up to date. Returns the ReportRefresh row."""
+    started = time.perf_counter()
+    watermark = datetime.utcnow()
+    last = db.session.execute(latest_report_refresh()).scalar()
+    full = full or last is None
+
+    school_ids = None
+    if not full:
+        # Overlap as in delta sync, for transactions that committed after the watermark
+        since = last.watermark - timedelta(seconds=current_app.config['SYNC_OVERLAP_SECONDS'])
+        school_ids = db.session.scalars(schools_changed_since(since)).all()
+
+    daily, classes = report_daily, report_classes
+    daily_rows = select(students.c.school_id, students.c.student_class, vaccinations.c.vaccine_name,
+                        vaccinations.c.vaccination_date, func.count())\
+        .select_from(students.join(vaccinations, vaccinations.c.student_id == students.c.student_id))\
+        .group_by(students.c.school_id, students.c.student_class, vaccinations.c.vaccine_name,
+                  vaccinations.c.vaccination_date)
+    class_rows = select(students.c.school_id, students.c.student_class,
+                        func.sum(case((students.c.is_active == True, 1), else_=0)),
+                        func.sum(case((and_(students.c.is_active == True, has_vaccination()), 1), else_=0)))\
+        .group_by(students.c.school_id, students.c.student_class)
+    clear_daily, clear_classes = delete(daily), delete(classes)
+    if school_ids is not None:
+        daily_rows = daily_rows.where(students.c.school_id.in_(school_ids))
+        class_rows = class_rows.where(students.c.school_id.in_(school_ids))
+        clear_daily = clear_daily.where(daily.c.school_id.in_(school_ids))
+        clear_classes = clear_classes.where(classes.c.school_id.in_(school_ids))
+
+    rows = 0
+    if school_ids != []:
+        db.session.execute(clear_daily)
+        db.session.execute(clear_classes)
+        rows += db.session.execute(insert(daily).from_select(
+            ['school_id', 'student_class', 'vaccine_name', 'vaccination_date', 'vaccinated'], daily_rows)).rowcount
+        rows += db.session.execute(insert(classes).from_select(
+            ['school_id', 'student_class', 'active_students', 'vaccinated_students'], class_rows)).rowcount
+
+    refresh = ReportRefresh(
+        watermark=watermark,
+        full=full,
+        schools=len(school_ids) if school_ids is not None else db.session.scalar(
+            select(func.count(distinct(classes.c.school_id)))),
+        rows=rows,
+        duration_ms=round((time.perf_counter() - started) * 1000, 1)
+    )
+    db.session.add(refresh)
+    db.session.commit()
+    return refresh
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresh the reporting tables')
+    parser.add_argument('--database-url', help='defaults to DATABASE_URL')
+    parser.add_argument('--full', action='store_true', help='rebuild every school, not only the changed ones')
+    args = parser.parse_args()
+
+    # The app reads its configuration at import time
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    from app import create_app
+    from models import db
+    app = create_app()
+
+    with app.app_context():
+        db.create_all()
+        refresh = refresh_reports(db, args.full)
+        print(f"{'Full' if refresh.full else 'Incremental'} refresh in {refresh.duration_ms:.0f} ms: "
+              f'{refresh.schools} schools, {refresh.rows} report rows written, watermark {refresh.watermark.isoformat()}')
+
+if __name__ == '__main__':
+    main()
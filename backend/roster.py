@@ -0,0 +1,262 @@
+# roster.py
+# Optional in-process roster index (ROSTER_INDEX=1). The active students of a school
+# are kept as __slots__ records with their vaccinations, so the student list filters,
+# search and facet counts are answered from memory instead of the database.
+#
+# A school's roster is built on first use. Commits that write to the school mark it
+# stale (see RoutingSession), and other workers' writes are picked up at most
+# ROSTER_INDEX_TTL seconds later. Either way the roster is brought up to date with
+# the ?updated_since= delta queries rather than rebuilt. Rosters are evicted least
+# recently used first once their estimated size exceeds ROSTER_INDEX_MAX_MB.
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from queries import student_list_statements, student_changes_statements, archived_students_since
+
+class RosterStudent:
+    __slots__ = ('student_id', 'first_name', 'last_name', 'date_of_birth', 'gender', 'contact_number',
+                 'student_class', 'vaccinations', 'search_keys')
+
+    def __init__(self, row, vaccinations):
+        (self.student_id, self.first_name, self.last_name, date_of_birth, self.gender,
+         self.contact_number, self.student_class) = row
+        self.date_of_birth = date_of_birth.isoformat() if date_of_birth else None
+        self.vaccinations = tuple(vaccinations)  # (vaccine_name, vaccination_date, drive_id)
+        self.search_keys = (self.first_name.lower(), self.last_name.lower(), str(self.student_id))
+
+    def matches(self, search):
+        first_name, last_name, student_id = self.search_keys
+        return search in first_name or search in last_name or search in student_id
+
+    def to_dict(self):
+        return {
+            'student_id': self.student_id,
+            'first_name': self.first_name,
+            'last_name': self.last_name,
+            'date_of_birth': self.date_of_birth,
+            'gender': self.gender,
+            'contact_number': self.contact_number,
+            'student_class': self.student_class,
+            'vaccinations': [{
+                'vaccine_name': vaccine_name,
+                'vaccination_date': vaccination_date,
+                'drive_id': drive_id
+            } for vaccine_name, vaccination_date, drive_id in self.vaccinations]
+        }
+
+    def nbytes(self):
+        size = sys.getsizeof(self) + sum(sys.getsizeof(getattr(self, name)) for name in self.__slots__)
+        size += sum(sys.getsizeof(key) for key in self.search_keys)
+        for vaccination in self.vaccinations:
+            size += sys.getsizeof(vaccination) + sum(sys.getsizeof(value) for value in vaccination)
+        return size
+
+def _group_vaccinations(vaccination_rows):
+    by_student = {}
+    for student_id, vaccine_name, vaccination_date, drive_id in vaccination_rows:
+        by_student.setdefault(student_id, []).append((vaccine_name, vaccination_date.isoformat(), drive_id))
+    return by_student
+
+class SchoolRoster:
+    """Active students of one school, ordered by student_id. Never modified once
+    built: a refresh creates a new roster, so readers need no lock."""
+
+    def __init__(self, school_id, students, synced_at):
+        self.school_id = school_id
+        self.students = students
+        self.synced_at = synced_at  # Server time the data was read at, for sync tokens
+        self.checked_at = time.monotonic()
+        self.stale = False
+        self.nbytes = sys.getsizeof(students) + sum(student.nbytes() for student in students.values())
+
+    def __len__(self):
+        return len(self.students)
+
+    def matching(self, search='', student_class='', vaccination_status=''):
+        search = search.lower()
+        for student in self.students.values():
+            if search and not student.matches(search):
+                continue
+            if student_class and student.student_class != student_class:
+                continue
+            if vaccination_status == 'vaccinated' and not student.vaccinations:
+                continue
+            if vaccination_status == 'not_vaccinated' and student.vaccinations:
+                continue
+            yield student
+
+    def student_list(self, search='', student_class='', vaccination_status=''):
+        return [student.to_dict() for student in self.matching(search, student_class, vaccination_status)]
+
+    def facets(self, search='', student_class='', vaccination_status=''):
+        # Same rules as student_facet_statements: each facet ignores its own filter
+        classes, vaccines = {}, {}
+        total = vaccinated = 0
+        for student in self.matching(search):
+            class_match = not student_class or student.student_class == student_class
+            status_match = not vaccination_status or \
+                (vaccination_status == 'vaccinated') == bool(student.vaccinations)
+            if status_match:
+                classes[student.student_class] = classes.get(student.student_class, 0) + 1
+            if class_match:
+                total += 1
+                vaccinated += bool(student.vaccinations)
+                if status_match:
+                    for vaccine_name, _, _ in student.vaccinations:
+                        vaccines[vaccine_name] = vaccines.get(vaccine_name, 0) + 1
+        status_counts = {'vaccinated': vaccinated, 'not_vaccinated': total - vaccinated}
+        return {
+            'total': status_counts.get(vaccination_status, total),
+            'classes': classes,
+            'vaccines': vaccines,
+            'vaccination_status': status_counts
+        }
+
+class SchoolIndex:
+    """Per-school entries kept in process memory. An entry is built on first use and
+    brought up to date once a write to the school marks it stale or `ttl` seconds have
+    passed. Entries are evicted least recently used first once their estimated size
+    exceeds the cap. Subclasses implement _build(school_id) and _refresh(entry); entries
+    have school_id, synced_at, checked_at, stale and nbytes and are never modified once
+    built, apart from those bookkeeping attributes."""
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # school_id -> entry, least recently used first
+        self.nbytes = 0
+        self.counts = {'hits': 0, 'builds': 0, 'refreshes': 0, 'evictions': 0}
+
+    def configure(self, db, max_mb, ttl):
+        self.enabled = True
+        self.db = db
+        self.max_mb = max_mb
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.ttl = ttl
+
+    def get(self, school_id):
+        """The school's entry, or None when the index is disabled."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(school_id)
+            if entry is not None:
+                self._entries.move_to_end(school_id)
+
+        if entry is None:
+            entry = self._store(self._build(school_id))
+            self._count('builds')
+        elif entry.stale or time.monotonic() - entry.checked_at >= self.ttl:
+            entry.stale = False
+            refreshed = self._refresh(entry)
+            if refreshed is not entry:
+                entry = self._store(refreshed)
+            self._count('refreshes')
+        else:
+            self._count('hits')
+        return entry
+
+    def record_write(self, school_id):
+        entry = self._entries.get(school_id)
+        if entry is not None:
+            entry.stale = True
+
+    def _since(self, entry):
+        return entry.synced_at - timedelta(seconds=current_app.config['SYNC_OVERLAP_SECONDS'])
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def _store(self, entry):
+        with self._lock:
+            previous = self._entries.pop(entry.school_id, None)
+            if previous is not None:
+                self.nbytes -= previous.nbytes
+            if entry.nbytes > self.max_bytes:
+                # Larger than the whole cap: serve it, but do not keep it
+                return entry
+            self._entries[entry.school_id] = entry
+            self.nbytes += entry.nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                self.counts['evictions'] += 1
+        return entry
+
+    def status(self):
+        with self._lock:
+            entries = list(self._entries.values())
+            counts = dict(self.counts)
+        now = time.monotonic()
+        return {
+            'enabled': self.enabled,
+            'max_mb': self.max_mb if self.enabled else None,
+            'used_mb': round(self.nbytes / 1024 / 1024, 2),
+            'counts': counts,
+            'schools': [{
+                'school_id': entry.school_id,
+                'students': len(entry),
+                'kib': round(entry.nbytes / 1024, 1),
+                'checked_seconds_ago': round(now - entry.checked_at, 1),
+                'stale': entry.stale
+            } for entry in reversed(entries)]
+        }
+
+class RosterIndex(SchoolIndex):
+    def __init__(self, app=None, db=None):
+        super().__init__()
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        app.config.setdefault('ROSTER_INDEX', False)
+        app.config.setdefault('ROSTER_INDEX_MAX_MB', 64)
+        app.config.setdefault('ROSTER_INDEX_TTL', 5.0)
+        app.config.setdefault('SYNC_OVERLAP_SECONDS', 10.0)
+        app.extensions['roster_index'] = self
+
+        if app.config['ROSTER_INDEX']:
+            self.configure(db, app.config['ROSTER_INDEX_MAX_MB'], app.config['ROSTER_INDEX_TTL'])
+
+    def _build(self, school_id):
+        synced_at = datetime.utcnow()
+        students_stmt, vaccinations_stmt = student_list_statements(school_id)
+        student_rows = self.db.session.execute(students_stmt.order_by(students_stmt.selected_columns.student_id)).all()
+        vaccinations = _group_vaccinations(self.db.session.execute(vaccinations_stmt))
+        students = {row.student_id: RosterStudent(row, vaccinations.get(row.student_id, ()))
+                    for row in student_rows}
+        return SchoolRoster(school_id, students, synced_at)
+
+    def _refresh(self, roster):
+        synced_at = datetime.utcnow()
+        since = self._since(roster)
+        students_stmt, vaccinations_stmt = student_changes_statements(roster.school_id, since)
+        changed = self.db.session.execute(students_stmt).all()
+        archived = self.db.session.execute(archived_students_since(roster.school_id, since)).scalars().all()
+        if not changed and not archived:
+            roster.synced_at = synced_at
+            roster.checked_at = time.monotonic()
+            return roster
+
+        vaccinations = _group_vaccinations(self.db.session.execute(vaccinations_stmt))
+        students = dict(roster.students)
+        last_id = next(reversed(students), 0)
+        in_order = True
+        for row in changed:
+            if row.is_active:
+                if row.student_id not in students and row.student_id < last_id:
+                    in_order = False
+                students[row.student_id] = RosterStudent(row[:-1], vaccinations.get(row.student_id, ()))
+            else:
+                students.pop(row.student_id, None)
+        for student_id in archived:
+            students.pop(student_id, None)
+        if not in_order:
+            students = dict(sorted(students.items()))
+        return SchoolRoster(roster.school_id, students, synced_at)
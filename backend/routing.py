@@ -0,0 +1,243 @@
+# routing.py
+# Read-replica routing for db.session. Reads made while serving GET/HEAD requests go
+# to a healthy replica, everything else stays on the primary:
+#   - writes, and any read after the session has flushed in the same request
+#   - requests sent with the X-Read-Primary header, and reads made while
+#     session.info['read_primary'] is set
+#   - reads of a school that was written to in the last REPLICA_STICKY_SECONDS
+#     (read-your-writes for e.g. the student list refresh after mark_vaccinated), and
+#     reads by a client that wrote in that time, through the STICKY_COOKIE
+#   - replicas whose lag exceeds REPLICA_MAX_LAG, or whose lag cannot be read
+#   - everything inside a POST /batch request, which runs as one primary transaction
+# The replica is picked once per transaction, and the session keeps reading from it
+# until it commits, rolls back or closes.
+#
+# RoutingSession also implements the batch transaction: while session.info['batch']
+# is set, commit() only flushes and rollback() only rolls back the savepoint of the
+# current sub-request (views/batch.py commits or rolls back the whole batch).
+import itertools
+import math
+import threading
+import time
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA_BIND_PREFIX = 'replica_'
+# Set on responses to requests that wrote: until the time in it (Unix seconds) the
+# client's reads go to the primary, whichever worker serves them
+STICKY_COOKIE = 'read_primary_until'
+# Extensions whose record_write(school_id) is called for every committed write to a school
+WRITE_LISTENERS = ('replica_router', 'roster_index', 'coverage_index', 'district_dashboard')
+
+def replica_binds(uris):
+    return {f'{REPLICA_BIND_PREFIX}{i}': uri for i, uri in enumerate(uris)}
+
+class ReplicaRouter:
+    def __init__(self, app=None, db=None):
+        self.db = db
+        self._lock = threading.Lock()
+        self._lag = {}  # bind key -> (checked_at, lag in seconds or None)
+        self._recent_writes = {}  # school_id -> monotonic time of the last commit
+        self._round_robin = itertools.count()
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.db = db
+        app.config.setdefault('REPLICA_MAX_LAG', 5.0)
+        app.config.setdefault('REPLICA_LAG_CHECK_INTERVAL', 5.0)
+        app.config.setdefault('REPLICA_STICKY_SECONDS', 5.0)
+        app.config.setdefault('REPLICA_LAG_QUERY', None)
+        app.extensions['replica_router'] = self
+        app.after_request(self._set_sticky_cookie)
+
+    def replica_keys(self):
+        return sorted(key for key in self.db.engines if key and key.startswith(REPLICA_BIND_PREFIX))
+
+    def measure_lag(self, engine):
+        lag_query = current_app.config['REPLICA_LAG_QUERY']
+        with engine.connect() as conn:
+            if lag_query:
+                lag = conn.execute(text(lag_query)).scalar()
+                return float(lag) if lag is not None else None
+
+            if engine.dialect.name != 'mysql':
+                # No replication status to read (e.g. two local SQLite files)
+                return 0.0
+
+            # MariaDB reports versions above 8.0.22 too, but keeps Seconds_Behind_Master
+            if engine.dialect._is_mariadb or engine.dialect.server_version_info < (8, 0, 22):
+                row = conn.execute(text('SHOW SLAVE STATUS')).mappings().first()
+            else:
+                row = conn.execute(text('SHOW REPLICA STATUS')).mappings().first()
+            if row is None:
+                return 0.0
+            lag = row['Seconds_Behind_Source'] if 'Seconds_Behind_Source' in row else row['Seconds_Behind_Master']
+            # NULL lag means replication is stopped
+            return float(lag) if lag is not None else None
+
+    def lag(self, key):
+        now = time.monotonic()
+        checked_at, lag = self._lag.get(key, (None, None))
+        if checked_at is not None and now - checked_at < current_app.config['REPLICA_LAG_CHECK_INTERVAL']:
+            return lag
+
+        try:
+            lag = self.measure_lag(self.db.engines[key])
+        except Exception as e:
+            current_app.logger.warning(f"Replica {key} lag check failed: {e}")
+            lag = None
+        with self._lock:
+            self._lag[key] = (now, lag)
+        return lag
+
+    def is_healthy(self, key):
+        lag = self.lag(key)
+        return lag is not None and lag <= current_app.config['REPLICA_MAX_LAG']
+
+    def pick_replica(self):
+        keys = self.replica_keys()
+        if not keys:
+            return None
+        start = next(self._round_robin)
+        for offset in range(len(keys)):
+            key = keys[(start + offset) % len(keys)]
+            if self.is_healthy(key):
+                return self.db.engines[key]
+        return None
+
+    def record_write(self, school_id):
+        with self._lock:
+            self._recent_writes[school_id] = time.monotonic()
+
+    def record_client_write(self):
+        g.read_primary_until = time.time() + current_app.config['REPLICA_STICKY_SECONDS']
+
+    def client_wrote_recently(self):
+        try:
+            return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def _set_sticky_cookie(self, response):
+        until = g.pop('read_primary_until', None)
+        if until is not None and self.replica_keys():
+            response.set_cookie(STICKY_COOKIE, f'{until:.3f}', max_age=math.ceil(until - time.time()),
+                                httponly=True, samesite='Lax')
+        return response
+
+    def recently_written(self, school_id):
+        written_at = self._recent_writes.get(school_id)
+        if written_at is None:
+            return False
+        return time.monotonic() - written_at < current_app.config['REPLICA_STICKY_SECONDS']
+
+    def status(self):
+        return {
+            'max_lag': current_app.config['REPLICA_MAX_LAG'],
+            'replicas': [{
+                'bind': key,
+                'lag': self.lag(key),
+                'healthy': self.is_healthy(key)
+            } for key in self.replica_keys()]
+        }
+
+class RoutingSession(Session):
+    """Session that sends read-only GET traffic to a replica bind."""
+
+    def commit(self):
+        if self.info.get('batch'):
+            self.flush()
+            return
+        super().commit()
+
+    def rollback(self):
+        savepoint = self.info.get('batch_savepoint')
+        if savepoint is not None:
+            if self.get_nested_transaction() is savepoint:
+                savepoint.rollback()
+            return
+        super().rollback()
+
+    def _use_replica(self, clause):
+        if not has_request_context() or request.method not in ('GET', 'HEAD'):
+            return False
+        if self.info.get('batch'):
+            return False
+        if isinstance(clause, UpdateBase) or self.info.get('wrote'):
+            return False
+        if request.headers.get('X-Read-Primary') or self.info.get('read_primary'):
+            return False
+
+        router = current_app.extensions.get('replica_router')
+        if router is None:
+            return False
+        if router.client_wrote_recently():
+            return False
+        school_id = (request.view_args or {}).get('school_id')
+        if school_id is not None and router.recently_written(school_id):
+            return False
+        return True
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._use_replica(clause):
+            # One replica per transaction, so its reads see a single point of the replica's lag
+            if 'replica' not in self.info:
+                self.info['replica'] = current_app.extensions['replica_router'].pick_replica()
+            if self.info['replica'] is not None:
+                return self.info['replica']
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def close(self):
+        self.info.pop('replica', None)
+        super().close()
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_written(session, flush_context):
+    session.info['wrote'] = True
+    school_id = (request.view_args or {}).get('school_id') if has_request_context() else None
+    if school_id is not None:
+        session.info.setdefault('written_schools', set()).add(school_id)
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _mark_statement_written(orm_execute_state):
+    # INSERT/UPDATE/DELETE statements run through session.execute() do not flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['wrote'] = True
+
+@event.listens_for(RoutingSession, 'after_soft_rollback')
+def _unpin_replica(session, previous_transaction):
+    session.info.pop('replica', None)
+
+@event.listens_for(RoutingSession, 'after_transaction_end')
+def _forget_writes(session, transaction):
+    # Rolled back or closed without a commit: nothing was written. Only the outermost
+    # transaction, so a batch sub-request's savepoint rollback keeps the others' writes.
+    if transaction.parent is None:
+        session.info.pop('wrote', None)
+        session.info.pop('written_schools', None)
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _record_school_write(session):
+    session.info.pop('replica', None)
+    wrote = session.info.pop('wrote', None)
+    written_schools = session.info.pop('written_schools', ())
+    router = current_app.extensions.get('replica_router') if has_app_context() else None
+    if wrote and router is not None and has_request_context():
+        router.record_client_write()
+    if wrote and not written_schools and has_app_context():
+        # Not tied to one school (e.g. POST /schools, CLI jobs): the district rollup rebuilds
+        district_dashboard = current_app.extensions.get('district_dashboard')
+        if district_dashboard is not None:
+            district_dashboard.invalidate()
+    if not written_schools or not has_request_context():
+        return
+    # The replica router pins the school to the primary, the in-process indexes mark it stale
+    for name in WRITE_LISTENERS:
+        extension = current_app.extensions.get(name)
+        if extension is not None:
+            for school_id in written_schools:
+                extension.record_write(school_id)
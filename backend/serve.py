@@ -0,0 +1,94 @@
+# serve.py
+# Server entry point.
+#
+#   python serve.py                              # production profile (gunicorn)
+#   python serve.py --workers 8 --threads 4
+#   python serve.py --profile development        # Flask dev server with reloader and debugger
+#
+# Graceful reload of the workers, letting in-flight requests finish:
+#   kill -HUP $(cat serve.pid)
+# The app is preloaded in the master, so deploying new code needs a new master:
+#   kill -USR2 $(cat serve.pid)   then   kill -QUIT <old master pid>
+import argparse
+
+import config
+
+_app = None
+
+def get_app():
+    global _app
+    if _app is None:
+        from app import create_app
+        _app = create_app()
+    return _app
+
+def create_tables():
+    from models import db
+    with get_app().app_context():
+        db.create_all()
+
+def on_starting(server):
+    # Runs once in the master, never in the workers
+    create_tables()
+
+def post_fork(server, worker):
+    # Connections opened in the master must not be shared with the forked workers
+    from models import db
+    with get_app().app_context():
+        # The replica binds too
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+def run_production(options):
+    from gunicorn.app.base import BaseApplication
+
+    class ProductionServer(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # Import every view up front so the forked workers share them
+            from views import load_views
+            app = get_app()
+            load_views(app)
+            return app
+
+    ProductionServer().run()
+
+def run_development(host, port):
+    create_tables()
+    get_app().run(debug=True, host=host, port=port)
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the vaccination drive API')
+    parser.add_argument('--profile', choices=['production', 'development'], default='production')
+    parser.add_argument('--bind', default=config.SERVER_BIND)
+    parser.add_argument('--workers', type=int, default=config.SERVER_WORKERS)
+    parser.add_argument('--threads', type=int, default=config.SERVER_THREADS)
+    parser.add_argument('--timeout', type=int, default=config.SERVER_TIMEOUT)
+    parser.add_argument('--graceful-timeout', type=int, default=config.SERVER_GRACEFUL_TIMEOUT)
+    parser.add_argument('--pidfile', default=config.SERVER_PIDFILE)
+    args = parser.parse_args()
+
+    if args.profile == 'development':
+        host, _, port = args.bind.rpartition(':')
+        run_development(host or 'localhost', int(port))
+        return
+
+    run_production({
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread' if args.threads > 1 else 'sync',
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        'pidfile': args.pidfile,
+        'preload_app': True,
+        'on_starting': on_starting,
+        'post_fork': post_fork,
+        'accesslog': '-',
+    })
+
+if __name__ == '__main__':
+    main()
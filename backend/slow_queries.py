@@ -0,0 +1,158 @@
+# slow_queries.py
+# Opt-in slow-query recorder. Statements slower than SLOW_QUERY_THRESHOLD_MS are
+# captured with their bound parameters and the Flask route that issued them. The
+# EXPLAIN plan is fetched on a separate pooled connection by a background thread so
+# the request that ran the slow statement does not wait for it; pools without a
+# separate connection to offer (in-memory SQLite) get no plan. Entries are written
+# to a rotating JSON-lines file and kept in memory for /internal/slow-queries.
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from flask import has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import StaticPool, SingletonThreadPool
+
+class SlowQueryLog:
+    def __init__(self, app=None):
+        self.enabled = False
+        self._recent = deque()
+        self._queue = queue.Queue(maxsize=1000)
+        self._worker = None
+        self._worker_pid = None
+        self._worker_lock = threading.Lock()
+        self.logger = logging.getLogger('slow_queries')
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SLOW_QUERY_THRESHOLD_MS', None)
+        app.config.setdefault('SLOW_QUERY_LOG', 'slow_queries.jsonl')
+        app.config.setdefault('SLOW_QUERY_LOG_MAX_BYTES', 10 * 1024 * 1024)
+        app.config.setdefault('SLOW_QUERY_LOG_BACKUPS', 5)
+        app.config.setdefault('SLOW_QUERY_RECENT', 200)
+        app.extensions['slow_query_log'] = self
+
+        threshold = app.config['SLOW_QUERY_THRESHOLD_MS']
+        if threshold is None:
+            return
+
+        self.enabled = True
+        self.threshold = float(threshold) / 1000
+        self._recent = deque(maxlen=app.config['SLOW_QUERY_RECENT'])
+
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        if app.config['SLOW_QUERY_LOG']:
+            # Opened on the first entry, in the process that writes it
+            handler = RotatingFileHandler(
+                app.config['SLOW_QUERY_LOG'],
+                maxBytes=app.config['SLOW_QUERY_LOG_MAX_BYTES'],
+                backupCount=app.config['SLOW_QUERY_LOG_BACKUPS'],
+                delay=True
+            )
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            self.logger.addHandler(handler)
+
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        # The worker starts with the first entry: create_app may run in the gunicorn
+        # master (preload_app), and threads do not survive the fork into the workers
+        os.register_at_fork(after_in_child=self._forked)
+
+    def recent(self):
+        return list(self._recent)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info['slow_query_start'] = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        start = conn.info.pop('slow_query_start', None)
+        if start is None or conn.info.get('slow_query_explain'):
+            return
+        duration = time.perf_counter() - start
+        if duration < self.threshold:
+            return
+
+        entry = {
+            'timestamp': datetime.utcnow().isoformat(),
+            'duration_ms': round(duration * 1000, 3),
+            'statement': statement,
+            'parameters': parameters,
+            'executemany': executemany,
+            'route': None,
+            'method': None,
+        }
+        if has_request_context():
+            entry['route'] = request.url_rule.rule if request.url_rule else request.path
+            entry['method'] = request.method
+
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((conn.engine, entry))
+        except queue.Full:
+            pass
+
+    def _ensure_worker(self):
+        if self._worker_pid == os.getpid():
+            return
+        with self._worker_lock:
+            if self._worker_pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=1000)
+            self._worker = threading.Thread(target=self._run, args=(self._queue,), name='slow-query-explain',
+                                            daemon=True)
+            self._worker.start()
+            self._worker_pid = os.getpid()
+
+    def _forked(self):
+        # The parent's worker, and whoever held these locks, did not come along
+        self._worker_lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+
+    def _explain(self, engine, entry):
+        if entry['executemany'] or not entry['statement'].lstrip().upper().startswith('SELECT'):
+            return None
+        if isinstance(engine.pool, (StaticPool, SingletonThreadPool)):
+            # The pool would hand out the request's own connection, and returning it
+            # rolls back whatever the request has not committed yet
+            entry['explain_skipped'] = f'{type(engine.pool).__name__} has no spare connection'
+            return None
+        prefix = 'EXPLAIN QUERY PLAN ' if engine.dialect.name == 'sqlite' else 'EXPLAIN '
+        with engine.connect() as conn:
+            conn.info['slow_query_explain'] = True
+            try:
+                result = conn.exec_driver_sql(prefix + entry['statement'], entry['parameters'])
+                return [dict(row) for row in result.mappings()]
+            finally:
+                conn.info.pop('slow_query_explain', None)
+
+    def _run(self, entries):
+        while True:
+            engine, entry = entries.get()
+            try:
+                entry['explain'] = self._explain(engine, entry)
+            except Exception as e:
+                entry['explain'] = None
+                entry['explain_error'] = str(e)
+            entry['parameters'] = _jsonable(entry['parameters'])
+            self._recent.append(entry)
+            self.logger.info(json.dumps(entry, default=str))
+            entries.task_done()
+
+def _jsonable(parameters):
+    if isinstance(parameters, dict):
+        return {key: _jsonable(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_jsonable(value) for value in parameters]
+    if parameters is None or isinstance(parameters, (str, int, float, bool)):
+        return parameters
+    return str(parameters)
@@ -0,0 +1,46 @@
+# tests/conftest.py
+# Every test gets a fresh app on an in-memory SQLite database with one school, a few
+# students and a drive. The modules live flat in backend/, so it goes on sys.path.
+import os
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from models import db, School, Student, VaccinationDrive
+
+AUTH = {'Authorization': 'school_admin_token'}
+
+@pytest.fixture
+def app():
+    app = create_app(SQLALCHEMY_DATABASE_URI='sqlite://', SQLALCHEMY_ENGINE_OPTIONS={}, SQLALCHEMY_BINDS={},
+                     TESTING=True)
+    with app.app_context():
+        # Only the primary: a test app with replicas leaves their bind keys on db
+        db.create_all(bind_key=None)
+        school = School(school_name='Test School', classes='1,2')
+        db.session.add(school)
+        db.session.flush()
+        db.session.add_all([
+            Student(school_id=school.school_id, first_name='Asha', last_name='Rao', gender='Female',
+                    student_class='1'),
+            Student(school_id=school.school_id, first_name='Ravi', last_name='Kumar', gender='Male',
+                    student_class='1'),
+            Student(school_id=school.school_id, first_name='Meera', last_name='Shah', gender='Female',
+                    student_class='2'),
+            VaccinationDrive(school_id=school.school_id, drive_date=date.today() + timedelta(days=7),
+                             vaccine_name='MMR', available_doses=10, applicable_classes='1,2'),
+        ])
+        db.session.commit()
+        db.session.remove()
+    # Each request then gets its own app context and session, as when serving
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
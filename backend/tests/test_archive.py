@@ -0,0 +1,33 @@
+# tests/test_archive.py
+from datetime import datetime, timedelta
+
+from archive import archive
+from helpers import encode_sync_token
+from models import db, Student, ArchivedStudent
+from conftest import AUTH
+
+def test_archive_on_empty_tables(app):
+    with app.app_context():
+        db.session.query(Student).delete()
+        db.session.commit()
+        assert archive(db, 730) == {'students': 0, 'vaccinations': 0, 'drives': 0}
+        assert archive(db, 730, dry_run=True) == {'students': 0, 'vaccinations': 0, 'drives': 0}
+
+def test_archived_student_is_readable_and_reported_to_sync(app, client):
+    app.config['SYNC_OVERLAP_SECONDS'] = 0
+    token = encode_sync_token(datetime.utcnow() - timedelta(seconds=1))
+    client.post('/schools/1/students/1/vaccinate', headers=AUTH, json={'drive_id': 1})
+    client.post('/schools/1/students/2/vaccinate', headers=AUTH, json={'drive_id': 1})
+    client.delete('/schools/1/students/1', headers=AUTH)
+    with app.app_context():
+        # Student 2 holds the highest vaccination id, student 3 the highest student id
+        assert archive(db, 730) == {'students': 1, 'vaccinations': 1, 'drives': 0}
+        assert db.session.get(ArchivedStudent, 1) is not None
+
+    assert client.get('/schools/1/students/1', headers=AUTH).status_code == 404
+    detail = client.get('/schools/1/students/1?include_archived=true', headers=AUTH).json
+    assert detail['archived'] is True
+    assert [v['vaccine_name'] for v in detail['vaccinations']] == ['MMR']
+    assert client.put('/schools/1/students/1?include_archived=true', headers=AUTH,
+                      json={'first_name': 'X'}).status_code == 404
+    assert client.get(f'/schools/1/students?updated_since={token}', headers=AUTH).json['deactivated'] == [1]
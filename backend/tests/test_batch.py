@@ -0,0 +1,46 @@
+# tests/test_batch.py
+from models import db, Student
+from conftest import AUTH
+
+def new_student(last_name='Student'):
+    return {'method': 'POST', 'path': '/schools/1/students',
+            'body': {'first_name': 'New', 'last_name': last_name, 'student_class': '1'}}
+
+# KeyError in the view: the body has no last_name
+BROKEN = {'method': 'POST', 'path': '/schools/1/students', 'body': {'first_name': 'New', 'student_class': '1'}}
+
+def student_count(app):
+    with app.app_context():
+        return db.session.query(Student).count()
+
+def test_non_atomic_batch_rolls_back_only_failed_sub_requests(app, client):
+    response = client.post('/batch', headers=AUTH, json={'requests': [
+        new_student('First'),
+        {'method': 'GET', 'path': '/schools/1/students/999'},
+        BROKEN,
+        new_student('Last'),
+    ]})
+    assert response.status_code == 200
+    assert response.json['committed'] is True
+    assert [result['status'] for result in response.json['results']] == [201, 404, 500, 201]
+    assert student_count(app) == 5
+
+def test_atomic_batch_rolls_back_everything_on_failure(app, client):
+    response = client.post('/batch', headers=AUTH, json={'atomic': True, 'requests': [
+        new_student(), BROKEN, new_student()]})
+    assert response.status_code == 400
+    assert response.json == {'committed': False, 'failed_index': 1, 'results': response.json['results']}
+    assert len(response.json['results']) == 2
+    assert student_count(app) == 3
+
+def test_batch_sub_requests_see_earlier_writes(client):
+    response = client.post('/batch', headers=AUTH, json={'atomic': True, 'requests': [
+        {'method': 'POST', 'path': '/schools/1/students/1/vaccinate', 'body': {'drive_id': 1}},
+        {'method': 'GET', 'path': '/schools/1/students/1/vaccinations'},
+    ]})
+    assert response.json['committed'] is True
+    assert [v['vaccine_name'] for v in response.json['results'][1]['body']] == ['MMR']
+
+def test_batch_rejects_nested_batches(client):
+    response = client.post('/batch', headers=AUTH, json={'requests': [{'method': 'POST', 'path': '/batch'}]})
+    assert response.json['results'][0]['status'] == 400
@@ -0,0 +1,48 @@
+# tests/test_coverage.py
+import pytest
+
+from conftest import AUTH
+
+def coverage(client, **params):
+    return client.get('/schools/1/analytics/coverage', headers=AUTH, query_string=params)
+
+@pytest.fixture
+def vaccinated(client):
+    # Asha (class 1, female) and Meera (class 2, female) get MMR; Ravi (class 1, male) does not
+    for student_id in (1, 3):
+        client.post(f'/schools/1/students/{student_id}/vaccinate', headers=AUTH, json={'drive_id': 1})
+
+def test_share_of_a_population(client, vaccinated):
+    assert coverage(client, population='gender:Female', query='vaccine:MMR').json == \
+        {'population': 2, 'matched': 2, 'share': 1.0}
+    assert coverage(client, query='vaccinated AND NOT class:2').json == \
+        {'population': 3, 'matched': 1, 'share': 0.3333}
+    assert coverage(client, query='(class:1 OR class:2) AND NOT vaccine:"MMR"').json['matched'] == 1
+
+def test_crosstab(client, vaccinated):
+    cells = coverage(client, rows='class', columns='gender').json['crosstab']['cells']
+    assert cells == {
+        '1': {'Female': {'population': 1, 'matched': 1, 'share': 1.0},
+              'Male': {'population': 1, 'matched': 0, 'share': 0.0}},
+        '2': {'Female': {'population': 1, 'matched': 1, 'share': 1.0},
+              'Male': {'population': 0, 'matched': 0, 'share': None}},
+    }
+
+@pytest.mark.parametrize('params', [
+    {'query': 'vaccine:MMR AND'},
+    {'query': '(vaccine:MMR'},
+    {'query': 'colour:red'},
+    {'rows': 'colour'},
+    {'columns': 'class'},
+])
+def test_invalid_requests(client, params):
+    assert coverage(client, **params).status_code == 400
+
+def test_writes_are_picked_up_incrementally(client, vaccinated):
+    assert coverage(client).json['matched'] == 2
+    client.post('/schools/1/students/2/vaccinate', headers=AUTH, json={'drive_id': 1})
+    client.delete('/schools/1/students/3', headers=AUTH)
+    assert coverage(client).json == {'population': 2, 'matched': 2, 'share': 1.0}
+    assert coverage(client, include_inactive='true').json['population'] == 3
+    counts = client.get('/internal/coverage', headers=AUTH).json
+    assert counts['counts']['refreshes'] >= 1
@@ -0,0 +1,27 @@
+# tests/test_db_pool.py
+from sqlalchemy import create_engine
+
+from db_pool import TimedQueuePool, pool_status
+
+def test_pool_status_counts_checkouts(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "pool.db"}', poolclass=TimedQueuePool, pool_size=2,
+                           max_overflow=1, pool_timeout=5)
+    try:
+        first, second = engine.connect(), engine.connect()
+        status = pool_status(engine)
+        assert status['pool_class'] == 'TimedQueuePool'
+        assert (status['size'], status['checked_out'], status['overflow'], status['max_overflow']) == (2, 2, 0, 1)
+        assert status['wait']['checkouts'] == 2 and status['wait']['timeouts'] == 0
+
+        third = engine.connect()
+        assert (pool_status(engine)['checked_out'], pool_status(engine)['overflow']) == (3, 1)
+        for connection in (first, second, third):
+            connection.close()
+        status = pool_status(engine)
+        assert (status['checked_out'], status['checked_in']) == (0, 2)
+    finally:
+        engine.dispose()
+
+def test_pool_status_of_other_pools():
+    engine = create_engine('sqlite://')
+    assert pool_status(engine) == {'pool_class': 'SingletonThreadPool'}
@@ -0,0 +1,38 @@
+# tests/test_delta_sync.py
+from datetime import datetime, timedelta
+
+from helpers import encode_sync_token, decode_sync_token
+from conftest import AUTH
+
+def test_sync_token_round_trip():
+    now = datetime.utcnow()
+    assert decode_sync_token(encode_sync_token(now)) == now
+    assert decode_sync_token('not a token') is None
+
+def test_invalid_token_is_rejected(client):
+    response = client.get('/schools/1/students?updated_since=garbage', headers=AUTH)
+    assert response.status_code == 400
+
+def test_student_changes_since_token(app, client):
+    app.config['SYNC_OVERLAP_SECONDS'] = 0
+    token = client.get('/schools/1/students', headers=AUTH).headers['X-Sync-Token']
+    assert client.get(f'/schools/1/students?updated_since={token}', headers=AUTH).json['students'] == []
+
+    client.post('/schools/1/students/2/vaccinate', headers=AUTH, json={'drive_id': 1})
+    client.delete('/schools/1/students/3', headers=AUTH)
+    changes = client.get(f'/schools/1/students?updated_since={token}', headers=AUTH).json
+    assert [student['student_id'] for student in changes['students']] == [2]
+    assert changes['students'][0]['vaccinations'][0]['vaccine_name'] == 'MMR'
+    assert changes['deactivated'] == [3]
+    assert decode_sync_token(changes['sync_token']) is not None
+
+def test_drive_changes_report_deleted_drives(app, client):
+    app.config['SYNC_OVERLAP_SECONDS'] = 0
+    token = encode_sync_token(datetime.utcnow() - timedelta(seconds=1))
+    created = client.post('/schools/1/drives', headers=AUTH, json={
+        'drive_date': '2030-01-15', 'vaccine_name': 'Polio', 'available_doses': 5, 'applicable_classes': '1'}).json
+    client.put('/schools/1/drives/1', headers=AUTH, json={'available_doses': 20})
+    client.delete(f"/schools/1/drives/{created['drive_id']}", headers=AUTH)
+    changes = client.get(f'/schools/1/drives?updated_since={token}', headers=AUTH).json
+    assert [drive['drive_id'] for drive in changes['drives']] == [1]
+    assert changes['deleted'] == [created['drive_id']]
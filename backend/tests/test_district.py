@@ -0,0 +1,22 @@
+# tests/test_district.py
+from conftest import AUTH
+
+def dashboard(client):
+    return client.get('/district/dashboard', headers=AUTH).json
+
+def test_school_write_reloads_only_that_school(app, client):
+    assert dashboard(client)['totals']['vaccinated_students'] == 0
+    client.post('/schools/1/students/1/vaccinate', headers=AUTH, json={'drive_id': 1})
+    assert dashboard(client)['totals']['vaccinated_students'] == 1
+    assert app.extensions['district_dashboard'].counts == {'hits': 0, 'builds': 1, 'updates': 1}
+
+def test_new_school_rebuilds_the_rollup(client):
+    assert dashboard(client)['totals']['schools'] == 1
+    client.post('/schools', headers=AUTH, json={'school_name': 'Another', 'classes': '1'})
+    assert dashboard(client)['total_schools'] == 2
+
+def test_sorting_and_paging(client):
+    client.post('/schools', headers=AUTH, json={'school_name': 'Another', 'classes': '1'})
+    page = client.get('/district/dashboard?sort=school_name&order=desc&page_size=1', headers=AUTH).json
+    assert [school['school_name'] for school in page['schools']] == ['Test School']
+    assert page['total_schools'] == 2
@@ -0,0 +1,53 @@
+# tests/test_facets.py
+# Each facet counts what the list would return with that facet's own filter swapped
+# for the facet value, with the roster index and without.
+from datetime import date, timedelta
+
+import pytest
+
+from models import db, VaccinationDrive
+from conftest import AUTH
+
+FILTERS = [{}, {'class': '1'}, {'search': 'a'}, {'vaccination_status': 'vaccinated'},
+           {'vaccination_status': 'not_vaccinated', 'class': '1'}, {'search': 'sh', 'vaccination_status': 'vaccinated'},
+           {'search': 'nobody'}]
+
+@pytest.fixture(params=[False, True], ids=['sql', 'roster_index'])
+def vaccinated_client(request, app, client):
+    with app.app_context():
+        db.session.add(VaccinationDrive(school_id=1, drive_date=date.today() + timedelta(days=14),
+                                        vaccine_name='Polio', available_doses=10, applicable_classes='1,2'))
+        db.session.commit()
+    client.post('/schools/1/students/1/vaccinate', headers=AUTH, json={'drive_id': 1})
+    client.post('/schools/1/students/1/vaccinate', headers=AUTH, json={'drive_id': 2})
+    client.post('/schools/1/students/3/vaccinate', headers=AUTH, json={'drive_id': 2})
+    if request.param:
+        app.extensions['roster_index'].configure(db, 64, 3600)
+    return client
+
+def _list(client, **filters):
+    response = client.get('/schools/1/students', headers=AUTH, query_string=filters)
+    assert response.status_code == 200
+    return response.json
+
+@pytest.mark.parametrize('filters', FILTERS, ids=lambda filters: '&'.join(f'{k}={v}' for k, v in filters.items()))
+def test_facets_match_the_filtered_list(vaccinated_client, filters):
+    client = vaccinated_client
+    facets = client.get('/schools/1/students/facets', headers=AUTH, query_string=filters).json
+    listed = _list(client, **filters)
+    assert facets['total'] == len(listed)
+
+    vaccines = {}
+    for student in listed:
+        for vaccination in student['vaccinations']:
+            vaccines[vaccination['vaccine_name']] = vaccines.get(vaccination['vaccine_name'], 0) + 1
+    assert facets['vaccines'] == vaccines
+
+    without_class = {key: value for key, value in filters.items() if key != 'class'}
+    assert sum(facets['classes'].values()) == len(_list(client, **without_class))
+    for student_class, count in facets['classes'].items():
+        assert count == len(_list(client, **without_class, **{'class': student_class}))
+
+    without_status = {key: value for key, value in filters.items() if key != 'vaccination_status'}
+    for status in ('vaccinated', 'not_vaccinated'):
+        assert facets['vaccination_status'][status] == len(_list(client, **without_status, vaccination_status=status))
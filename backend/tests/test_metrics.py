@@ -0,0 +1,35 @@
+# tests/test_metrics.py
+from models import db
+from queries import student_by_id
+from conftest import AUTH
+
+ROUTE = 'method="GET",route="/schools/<int:school_id>/students"'
+
+def _samples(client):
+    text = client.get('/metrics').get_data(as_text=True)
+    return dict(line.rsplit(' ', 1) for line in text.splitlines() if not line.startswith('#'))
+
+def test_request_shows_up_in_metrics(client):
+    assert client.get('/schools/1/students', headers=AUTH).status_code == 200
+    samples = _samples(client)
+
+    assert samples[f'http_requests_total{{{ROUTE},status="200"}}'] == '1'
+    assert samples[f'http_request_duration_seconds_count{{{ROUTE}}}'] == '1'
+    assert samples[f'http_request_duration_seconds_bucket{{{ROUTE},le="+Inf"}}'] == '1'
+    assert float(samples[f'http_request_duration_seconds_sum{{{ROUTE}}}']) > 0
+    # The student and vaccination queries
+    assert samples[f'http_request_sql_statements_count{{{ROUTE}}}'] == '1'
+    assert float(samples[f'http_request_sql_statements_sum{{{ROUTE}}}']) == 2
+
+def test_lambda_statement_is_compiled_once(app, client):
+    before = client.get('/internal/statement-cache', headers=AUTH).json['statements']
+    with app.app_context():
+        # Different parameters, one cache entry
+        assert db.session.execute(student_by_id(1, 1)).scalars().one().first_name == 'Asha'
+        assert db.session.execute(student_by_id(1, 2)).scalars().one().first_name == 'Ravi'
+    status = client.get('/internal/statement-cache', headers=AUTH).json
+    assert status['statements']['cache_miss'] - before['cache_miss'] == 1
+    assert status['statements']['cache_hit'] - before['cache_hit'] == 1
+    assert status['size'] >= 1
+    hits = _samples(client)['sqlalchemy_compiled_cache_total{result="cache_hit"}']
+    assert int(hits) == status['statements']['cache_hit']
@@ -0,0 +1,59 @@
+# tests/test_reporting.py
+import pytest
+
+from archive import archive
+from models import db
+from reporting import refresh_reports
+from conftest import AUTH
+
+@pytest.fixture
+def no_overlap(app):
+    # Incremental refreshes then only pick up what changed after the last one
+    app.config['SYNC_OVERLAP_SECONDS'] = 0
+
+def _refresh(app, full=False):
+    with app.app_context():
+        refresh = refresh_reports(db, full=full)
+        return refresh.full, refresh.schools
+
+def _totals(client):
+    report = client.get('/schools/1/reports/coverage', headers=AUTH)
+    assert report.status_code == 200
+    return report.json['totals']
+
+def test_full_refresh(app, client):
+    assert client.get('/schools/1/reports/coverage', headers=AUTH).status_code == 503
+    client.post('/schools/1/students/1/vaccinate', headers=AUTH, json={'drive_id': 1})
+    client.post('/schools/1/students/3/vaccinate', headers=AUTH, json={'drive_id': 1})
+    assert _refresh(app, full=True) == (True, 1)
+
+    report = client.get('/schools/1/reports/coverage', headers=AUTH).json
+    assert [(row['student_class'], row['active_students'], row['vaccinated_students'])
+            for row in report['classes']] == [('1', 2, 1), ('2', 1, 1)]
+    assert report['totals']['vaccinations'] == {'MMR': 2}
+
+def test_incremental_refresh_only_rewrites_changed_schools(app, client, no_overlap):
+    # The first refresh is full: there is no watermark yet
+    assert _refresh(app) == (True, 1)
+    assert _totals(client)['vaccinated_students'] == 0
+    assert _refresh(app) == (False, 0)
+
+    client.post('/schools/1/students/2/vaccinate', headers=AUTH, json={'drive_id': 1})
+    assert _refresh(app) == (False, 1)
+    totals = _totals(client)
+    assert (totals['vaccinated_students'], totals['vaccinations']) == (1, {'MMR': 1})
+
+def test_incremental_refresh_after_archiving(app, client, no_overlap):
+    client.post('/schools/1/students/1/vaccinate', headers=AUTH, json={'drive_id': 1})
+    client.post('/schools/1/students/2/vaccinate', headers=AUTH, json={'drive_id': 1})
+    client.delete('/schools/1/students/1', headers=AUTH)
+    _refresh(app)
+    # A deactivated student's vaccinations still count, until the student is archived
+    totals = _totals(client)
+    assert (totals['active_students'], totals['vaccinations']) == (2, {'MMR': 2})
+
+    with app.app_context():
+        assert archive(db, 730)['students'] == 1
+    assert _refresh(app) == (False, 1)
+    totals = _totals(client)
+    assert (totals['active_students'], totals['vaccinations']) == (2, {'MMR': 1})
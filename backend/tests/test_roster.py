@@ -0,0 +1,56 @@
+# tests/test_roster.py
+# The roster index must answer the student list and facets exactly as the SQL path does.
+import pytest
+
+from models import db
+from conftest import AUTH
+
+QUERIES = ['', '?class=1', '?search=ra', '?vaccination_status=vaccinated', '?vaccination_status=not_vaccinated',
+           '?search=a&class=2&vaccination_status=not_vaccinated']
+
+@pytest.fixture
+def roster_index(app):
+    index = app.extensions['roster_index']
+    # A long TTL: only the writes below make the rosters stale
+    index.configure(db, 64, 3600)
+    return index
+
+def _students(response):
+    assert response.status_code == 200
+    return sorted(({**student, 'vaccinations': sorted(student['vaccinations'], key=lambda v: v['vaccine_name'])}
+                   for student in response.json), key=lambda student: student['student_id'])
+
+def _assert_index_matches_sql(client, roster_index):
+    for query in QUERIES:
+        indexed = (_students(client.get(f'/schools/1/students{query}', headers=AUTH)),
+                   client.get(f'/schools/1/students/facets{query}', headers=AUTH).json)
+        roster_index.enabled = False
+        try:
+            from_sql = (_students(client.get(f'/schools/1/students{query}', headers=AUTH)),
+                        client.get(f'/schools/1/students/facets{query}', headers=AUTH).json)
+        finally:
+            roster_index.enabled = True
+        assert indexed == from_sql, query
+
+def test_roster_matches_sql_before_and_after_writes(client, roster_index):
+    _assert_index_matches_sql(client, roster_index)
+    assert roster_index.counts['builds'] == 1
+
+    client.post('/schools/1/students/1/vaccinate', headers=AUTH, json={'drive_id': 1})
+    client.post('/schools/1/students', headers=AUTH,
+                json={'first_name': 'Kiran', 'last_name': 'Das', 'student_class': '2', 'gender': 'Male'})
+    client.put('/schools/1/students/2', headers=AUTH, json={'student_class': '2'})
+    client.delete('/schools/1/students/3', headers=AUTH)
+    _assert_index_matches_sql(client, roster_index)
+
+    # Brought up to date from the delta queries, not rebuilt
+    assert roster_index.counts['builds'] == 1 and roster_index.counts['refreshes'] >= 1
+    names = [student['first_name'] for student in client.get('/schools/1/students', headers=AUTH).json]
+    assert names == ['Asha', 'Ravi', 'Kiran']
+
+def test_stale_roster_is_refreshed_by_the_next_read(client, roster_index):
+    client.get('/schools/1/students', headers=AUTH)
+    client.post('/schools/1/students/2/vaccinate', headers=AUTH, json={'drive_id': 1})
+    assert roster_index.status()['schools'][0]['stale'] is True
+    vaccinated = client.get('/schools/1/students?vaccination_status=vaccinated', headers=AUTH).json
+    assert [student['student_id'] for student in vaccinated] == [2]
@@ -0,0 +1,105 @@
+# tests/test_routing.py
+# Two SQLite files stand in for read replicas of a third.
+import shutil
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+from flask import g
+from sqlalchemy import event
+
+from app import create_app
+from models import db, School, Student
+from routing import STICKY_COOKIE, replica_binds
+from conftest import AUTH
+
+@pytest.fixture
+def replicated(tmp_path):
+    primary = tmp_path / 'primary.db'
+    replicas = [tmp_path / 'replica_0.db', tmp_path / 'replica_1.db']
+    app = create_app(SQLALCHEMY_DATABASE_URI=f'sqlite:///{primary}', SQLALCHEMY_ENGINE_OPTIONS={},
+                     SQLALCHEMY_BINDS=replica_binds([f'sqlite:///{replica}' for replica in replicas]),
+                     TESTING=True)
+    with app.app_context():
+        db.create_all(bind_key=None)
+        db.session.add(School(school_name='Test School', classes='1,2'))
+        db.session.commit()
+        for replica in replicas:
+            shutil.copy(primary, replica)
+
+        binds = []
+        for key, engine in db.engines.items():
+            event.listen(engine, 'before_cursor_execute', lambda *args, key=key: binds.append(key))
+        db.session.remove()
+    # Requests get their own app context, and with it their own session
+    return app, binds
+
+def test_one_replica_per_request(replicated):
+    app, binds = replicated
+    client = app.test_client()
+    used = []
+    for _ in range(4):
+        binds.clear()
+        assert client.get('/schools/1/dashboard', headers=AUTH).status_code == 200
+        assert len(set(binds)) == 1 and binds[0].startswith('replica_')
+        used.append(binds[0])
+    assert set(used) == {'replica_0', 'replica_1'}
+
+def test_client_that_wrote_reads_from_the_primary(replicated):
+    app, binds = replicated
+    writer, reader = app.test_client(), app.test_client()
+    response = writer.post('/schools', headers=AUTH, json={'school_name': 'Another', 'classes': '1'})
+    assert STICKY_COOKIE in response.headers['Set-Cookie']
+
+    binds.clear()
+    writer.get('/schools/2/dashboard', headers=AUTH)
+    assert set(binds) == {None}
+    binds.clear()
+    reader.get('/schools/1/dashboard', headers=AUTH)
+    assert all(key and key.startswith('replica_') for key in binds)
+
+def test_reads_do_not_set_the_cookie(replicated):
+    app, binds = replicated
+    assert 'Set-Cookie' not in app.test_client().get('/schools/1/dashboard', headers=AUTH).headers
+
+def test_rolled_back_write_is_forgotten(replicated):
+    app, binds = replicated
+    router = app.extensions['replica_router']
+    with app.test_request_context('/schools/1/students', method='POST'):
+        db.session.add(Student(school_id=1, first_name='Asha', last_name='Rao', student_class='1'))
+        db.session.flush()
+        assert db.session.info['written_schools'] == {1}
+        db.session.rollback()
+        assert 'wrote' not in db.session.info and 'written_schools' not in db.session.info
+        # A later commit in the same request has nothing to report
+        db.session.commit()
+        assert not router.recently_written(1)
+        assert 'read_primary_until' not in g
+
+class FakeStatusEngine:
+    """Answers SHOW REPLICA/SLAVE STATUS with `status`, as `dialect` would."""
+
+    def __init__(self, status, mariadb=False, version=(8, 0, 36)):
+        self.status = status
+        self.shown = []
+        self.dialect = SimpleNamespace(name='mysql', _is_mariadb=mariadb, server_version_info=version)
+
+    @contextmanager
+    def connect(self):
+        def execute(statement):
+            self.shown.append(str(statement))
+            return SimpleNamespace(mappings=lambda: SimpleNamespace(first=lambda: self.status))
+        yield SimpleNamespace(execute=execute)
+
+@pytest.mark.parametrize('engine, shown, lag', [
+    (FakeStatusEngine({'Seconds_Behind_Source': 3}), 'SHOW REPLICA STATUS', 3.0),
+    (FakeStatusEngine({'Seconds_Behind_Master': 4}, version=(8, 0, 21)), 'SHOW SLAVE STATUS', 4.0),
+    # MariaDB 10.x+ reports a version above (8, 0, 22) and still names the column after the master
+    (FakeStatusEngine({'Seconds_Behind_Master': 2}, mariadb=True, version=(10, 11, 6)), 'SHOW SLAVE STATUS', 2.0),
+    (FakeStatusEngine({'Seconds_Behind_Source': None}), 'SHOW REPLICA STATUS', None),
+    (FakeStatusEngine(None), 'SHOW REPLICA STATUS', 0.0),
+])
+def test_measure_lag(app, engine, shown, lag):
+    with app.app_context():
+        assert app.extensions['replica_router'].measure_lag(engine) == lag
+    assert engine.shown == [shown]
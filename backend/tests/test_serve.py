@@ -0,0 +1,22 @@
+# tests/test_serve.py
+from sqlalchemy import event
+
+import serve
+from app import create_app
+from models import db
+from routing import replica_binds
+
+def test_post_fork_disposes_every_engine(tmp_path, monkeypatch):
+    app = create_app(SQLALCHEMY_DATABASE_URI=f'sqlite:///{tmp_path / "primary.db"}', SQLALCHEMY_ENGINE_OPTIONS={},
+                     SQLALCHEMY_BINDS=replica_binds([f'sqlite:///{tmp_path / "replica.db"}']), TESTING=True)
+    monkeypatch.setattr(serve, '_app', app)
+    disposed = []
+    with app.app_context():
+        engines = list(db.engines.values())
+        for engine in engines:
+            event.listen(engine, 'engine_disposed', disposed.append)
+    serve.post_fork(server=None, worker=None)
+    assert len(engines) == 2 and disposed == engines
+    with app.app_context():
+        for engine in engines:
+            engine.dispose()
@@ -0,0 +1,68 @@
+# tests/test_slow_queries.py
+import time
+
+import pytest
+from sqlalchemy import event, select, func
+from sqlalchemy.engine import Engine
+
+from app import create_app
+from models import db, School, Student, VaccinationDrive
+from queries import report_classes
+from reporting import refresh_reports
+from conftest import AUTH
+
+@pytest.fixture
+def logged_app():
+    # Every statement is slow; nothing goes to a file
+    app = create_app(SQLALCHEMY_DATABASE_URI='sqlite://', SQLALCHEMY_ENGINE_OPTIONS={}, SQLALCHEMY_BINDS={},
+                     TESTING=True, SLOW_QUERY_THRESHOLD_MS=0, SLOW_QUERY_LOG='')
+    log = app.extensions['slow_query_log']
+    with app.app_context():
+        db.create_all(bind_key=None)
+        db.session.add(School(school_name='Test School', classes='1'))
+        db.session.flush()
+        db.session.add(Student(school_id=1, first_name='Asha', last_name='Rao', student_class='1'))
+        db.session.commit()
+        db.session.remove()
+    yield app
+    # The listeners are on Engine, so they would outlive the app
+    event.remove(Engine, 'before_cursor_execute', log._before_cursor_execute)
+    event.remove(Engine, 'after_cursor_execute', log._after_cursor_execute)
+    with app.app_context():
+        db.engine.dispose()
+
+def _wait_for_entries(log):
+    deadline = time.monotonic() + 5
+    while log._queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return log.recent()
+
+def test_explain_does_not_roll_back_on_a_static_pool(logged_app):
+    log = logged_app.extensions['slow_query_log']
+    with logged_app.app_context():
+        refresh_reports(db, full=True)
+        entries = _wait_for_entries(log)
+        # In-memory SQLite has one connection: an EXPLAIN on it would have rolled back the refresh
+        assert db.session.scalar(select(func.count()).select_from(report_classes)) == 1
+    selects = [entry for entry in entries if entry['statement'].lstrip().upper().startswith('SELECT')]
+    assert selects and all(entry['explain'] is None and 'explain_skipped' in entry for entry in selects)
+
+def test_slow_query_records_route(logged_app):
+    log = logged_app.extensions['slow_query_log']
+    assert logged_app.test_client().get('/schools/1/students', headers=AUTH).status_code == 200
+    assert '/schools/<int:school_id>/students' in {entry['route'] for entry in _wait_for_entries(log)}
+
+def test_worker_starts_with_the_first_entry_in_each_process(logged_app):
+    log = logged_app.extensions['slow_query_log']
+    # Nothing logged since create_app, as in a preloaded gunicorn master
+    log._forked()
+    assert log._worker is None
+    logged_app.test_client().get('/schools/1/students', headers=AUTH)
+    first = log._worker
+    assert first.is_alive()
+
+    # A forked worker process gets its own thread and queue
+    log._forked()
+    logged_app.test_client().get('/schools/1/students', headers=AUTH)
+    assert log._worker is not first and log._worker.is_alive()
+    assert _wait_for_entries(log)[-1]['route'] == '/schools/<int:school_id>/students'
@@ -0,0 +1,57 @@
+# tests/test_timeseries.py
+from datetime import date
+
+import pytest
+
+from models import db, Vaccination
+from conftest import AUTH
+
+@pytest.fixture
+def history(app):
+    with app.app_context():
+        db.session.add_all([
+            Vaccination(student_id=1, drive_id=1, vaccine_name='MMR', vaccination_date=date(2026, 1, 5),
+                        vaccinated_status=True),
+            Vaccination(student_id=2, drive_id=1, vaccine_name='MMR', vaccination_date=date(2026, 1, 7),
+                        vaccinated_status=True),
+            Vaccination(student_id=3, drive_id=1, vaccine_name='MMR', vaccination_date=date(2026, 1, 14),
+                        vaccinated_status=True),
+        ])
+        db.session.commit()
+
+def series(client, path='/schools/1/coverage/timeseries', **params):
+    response = client.get(path, headers=AUTH, query_string=dict(vaccine='MMR', **params))
+    assert response.status_code == 200, response.json
+    return [(point['period'], point['vaccinated'], point['cumulative']) for point in response.json['series']]
+
+def test_daily_series_carries_the_total_from_before_the_window(client, history):
+    assert series(client, **{'from': '2026-01-06', 'to': '2026-01-08'}) == [
+        ('2026-01-06', 0, 1), ('2026-01-07', 1, 2), ('2026-01-08', 0, 2)]
+
+def test_weekly_series(client, history):
+    assert series(client, bucket='week', **{'from': '2026-01-01', 'to': '2026-01-20'}) == [
+        ('2025-12-29', 0, 0), ('2026-01-05', 2, 2), ('2026-01-12', 1, 3), ('2026-01-19', 0, 3)]
+
+def test_district_series_matches_the_school(client, history):
+    params = {'from': '2026-01-01', 'to': '2026-01-31', 'bucket': 'week'}
+    assert series(client, '/district/coverage/timeseries', **params) == series(client, **params)
+
+def test_closed_periods_are_cached(app, client, history):
+    params = {'from': '2026-01-01', 'to': '2026-01-31'}
+    first = series(client, **params)
+    assert series(client, **params) == first
+    assert app.extensions['coverage_series'].counts == {'hits': 1, 'misses': 1}
+    # A later window only scans what the cache does not cover, and agrees with a cold read
+    later = series(client, **{'from': '2026-01-10', 'to': '2026-02-10'})
+    app.extensions['coverage_series']._closed.clear()
+    assert series(client, **{'from': '2026-01-10', 'to': '2026-02-10'}) == later
+
+@pytest.mark.parametrize('params', [
+    {'vaccine': ''},
+    {'vaccine': 'MMR', 'bucket': 'month'},
+    {'vaccine': 'MMR', 'from': '2026-02-01', 'to': '2026-01-01'},
+    {'vaccine': 'MMR', 'from': 'yesterday'},
+    {'vaccine': 'MMR', 'from': '2000-01-01', 'to': '2026-01-01'},
+])
+def test_invalid_requests(client, params):
+    assert client.get('/schools/1/coverage/timeseries', headers=AUTH, query_string=params).status_code == 400
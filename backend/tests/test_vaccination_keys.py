@@ -0,0 +1,40 @@
+# tests/test_vaccination_keys.py
+from datetime import date
+
+import pytest
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from models import db
+from queries import vaccinations, vaccination_keys
+from conftest import AUTH
+
+def keys(app):
+    with app.app_context():
+        return db.session.execute(select(vaccination_keys.c.student_id, vaccination_keys.c.vaccine_name)
+                                  .order_by(vaccination_keys.c.student_id)).all()
+
+def test_duplicate_vaccination_is_rejected_from_the_key_table(app, client):
+    first = client.post('/schools/1/students/1/vaccinate', headers=AUTH, json={'drive_id': 1})
+    assert first.status_code == 201
+    again = client.post('/schools/1/students/1/vaccinate', headers=AUTH, json={'drive_id': 1})
+    assert again.status_code == 400
+    assert again.json['existing_vaccination']['vaccination_id'] == first.json['vaccination']['vaccination_id']
+    assert keys(app) == [(1, 'MMR')]
+
+def test_triggers_keep_the_keys_in_step(app):
+    with app.app_context():
+        row = {'drive_id': 1, 'vaccine_name': 'MMR', 'vaccination_date': date(2026, 1, 5), 'vaccinated_status': True}
+        db.session.execute(insert(vaccinations), [dict(row, student_id=1), dict(row, student_id=2)])
+        db.session.execute(update(vaccinations).where(vaccinations.c.student_id == 2).values(student_id=3))
+        db.session.execute(delete(vaccinations).where(vaccinations.c.student_id == 1))
+        db.session.commit()
+    assert keys(app) == [(3, 'MMR')]
+
+def test_core_insert_of_a_duplicate_fails(app):
+    with app.app_context():
+        row = {'student_id': 1, 'drive_id': 1, 'vaccine_name': 'MMR', 'vaccination_date': date(2026, 1, 5)}
+        db.session.execute(insert(vaccinations), [row])
+        with pytest.raises(IntegrityError):
+            db.session.execute(insert(vaccinations), [row])
+        db.session.rollback()
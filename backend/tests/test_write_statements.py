@@ -0,0 +1,37 @@
+# tests/test_write_statements.py
+# Writes build their responses from the objects they just wrote (user-038), so each
+# stays within the statement budget bench.py also checks.
+import pytest
+from sqlalchemy import event
+
+from bench import WRITE_STATEMENT_BUDGET
+from models import db
+from conftest import AUTH
+
+WRITES = {
+    'student_create': lambda client: client.post('/schools/1/students', headers=AUTH, json={
+        'first_name': 'New', 'last_name': 'Student', 'student_class': '1'}),
+    'vaccinate': lambda client: client.post('/schools/1/students/1/vaccinate', headers=AUTH, json={'drive_id': 1}),
+    'drive_create': lambda client: client.post('/schools/1/drives', headers=AUTH, json={
+        'drive_date': '2030-01-15', 'vaccine_name': 'Polio', 'available_doses': 5, 'applicable_classes': '1'}),
+    'drive_update': lambda client: client.put('/schools/1/drives/1', headers=AUTH, json={'available_doses': 20}),
+}
+
+@pytest.fixture
+def statements(app):
+    executed = []
+    with app.app_context():
+        engine = db.engine
+    listener = lambda conn, cursor, statement, *args: executed.append(statement)
+    event.listen(engine, 'before_cursor_execute', listener)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', listener)
+
+@pytest.mark.parametrize('name', sorted(WRITE_STATEMENT_BUDGET))
+def test_write_stays_within_statement_budget(client, statements, name):
+    response = WRITES[name](client)
+    assert response.status_code < 400, response.get_data(as_text=True)
+    assert len(statements) <= WRITE_STATEMENT_BUDGET[name], statements
+
+def test_every_budgeted_write_is_tested():
+    assert WRITES.keys() == WRITE_STATEMENT_BUDGET.keys()
@@ -0,0 +1,107 @@
+# timeseries.py
+# Cumulative coverage per vaccine over time, for a school or the whole district. The
+# per-period counts and running totals come from one windowed query
+# (queries.coverage_series_statement). Periods that have closed never change, so
+# their counts are cached per (school, vaccine, bucket). Once a series has been read,
+# later requests only scan the open periods since the last cached one, however long
+# the history is.
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from queries import coverage_series_statement
+
+BUCKETS = ('day', 'week')
+
+# A period is closed once it ended this long ago. Covers vaccinations dated just before
+# midnight that commit after it, and replica lag.
+CLOSE_DELAY = timedelta(hours=1)
+
+def period_start(day, bucket):
+    return day - timedelta(days=day.weekday()) if bucket == 'week' else day
+
+def period_length(bucket):
+    return timedelta(days=7 if bucket == 'week' else 1)
+
+class ClosedPeriods:
+    __slots__ = ('through', 'periods', 'totals')
+
+    def __init__(self, through, periods, totals):
+        self.through = through  # Every closed period up to and including this one is known
+        self.periods = periods  # Periods with vaccinations, ascending
+        self.totals = totals  # Running total at each of them
+
+class CoverageSeries:
+    def __init__(self, app=None, db=None):
+        self._lock = threading.Lock()
+        self._closed = OrderedDict()  # (school_id, vaccine_name, bucket) -> ClosedPeriods
+        self.counts = {'hits': 0, 'misses': 0}
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        app.config.setdefault('COVERAGE_SERIES_CACHE_SIZE', 1024)
+        app.extensions['coverage_series'] = self
+        self.db = db
+        self.max_entries = app.config['COVERAGE_SERIES_CACHE_SIZE']
+
+    def series(self, school_id, vaccine_name, bucket, start, end):
+        """[(period start, vaccinated in the period, vaccinated up to its end)] for every
+        period from the one containing `start` to the one containing `end`."""
+        key = (school_id, vaccine_name, bucket)
+        step = period_length(bucket)
+        last_closed = period_start((datetime.utcnow() - CLOSE_DELAY).date(), bucket) - step
+        with self._lock:
+            closed = self._closed.get(key)
+            if closed is not None:
+                self._closed.move_to_end(key)
+
+        periods, totals = (closed.periods, closed.totals) if closed else ([], [])
+        if closed is None or closed.through < period_start(end, bucket):
+            # Only what the cache does not cover: everything after its last closed period
+            scan_from = closed.through + step if closed else None
+            offset = totals[-1] if totals else 0
+            # Through the end of the last period, so it is never cached half counted
+            scan_to = period_start(end, bucket) + step - timedelta(days=1)
+            rows = self.db.session.execute(coverage_series_statement(
+                school_id, vaccine_name, bucket, scan_from, scan_to)).all()
+            periods = periods + [row.period for row in rows]
+            totals = totals + [offset + int(row.cumulative) for row in rows]
+            self._count('misses')
+
+            through = min(last_closed, period_start(end, bucket))
+            if closed is None or through > closed.through:
+                known = bisect_right(periods, through)
+                self._remember(key, ClosedPeriods(through, periods[:known], totals[:known]))
+        else:
+            self._count('hits')
+
+        result = []
+        period = period_start(start, bucket)
+        index = bisect_right(periods, period - step)
+        total = totals[index - 1] if index else 0
+        while period <= end:
+            vaccinated = 0
+            if index < len(periods) and periods[index] == period:
+                vaccinated = totals[index] - total
+                total = totals[index]
+                index += 1
+            result.append((period, vaccinated, total))
+            period += step
+        return result
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def _remember(self, key, closed):
+        with self._lock:
+            self._closed[key] = closed
+            self._closed.move_to_end(key)
+            while len(self._closed) > self.max_entries:
+                self._closed.popitem(last=False)
+
+    def status(self):
+        with self._lock:
+            return {'series': len(self._closed), 'max_series': self.max_entries, 'counts': dict(self.counts)}
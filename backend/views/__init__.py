@@ -0,0 +1,85 @@
+# views/__init__.py
+# URL rules for every blueprint. The view modules are only imported when one of
+# their routes is first requested, so building the app stays cheap for workers,
+# CLI tools and tests that never serve those routes.
+from flask import Blueprint
+from werkzeug.utils import cached_property, import_string
+
+ROUTES = {
+    'schools': [
+        ('/login', 'login', ['POST']),
+        ('/schools/<int:school_id>/dashboard', 'get_dashboard_data', ['GET']),
+        ('/schools', 'manage_schools', ['GET', 'POST']),
+        ('/schools/<int:school_id>', 'single_school', ['GET', 'PUT']),
+        ('/schools/<int:school_id>/workspace', 'get_workspace', ['GET']),
+    ],
+    'students': [
+        ('/schools/<int:school_id>/students', 'manage_students', ['GET', 'POST']),
+        ('/schools/<int:school_id>/students/facets', 'get_student_facets', ['GET']),
+        ('/schools/<int:school_id>/students/vaccinations', 'get_students_vaccinations', ['GET']),
+        ('/schools/<int:school_id>/students/<int:student_id>', 'student_detail', ['GET', 'PUT', 'DELETE']),
+        ('/schools/<int:school_id>/students/bulk', 'bulk_upload_students', ['POST']),
+        ('/schools/<int:school_id>/students/<int:student_id>/vaccinations', 'get_student_vaccinations', ['GET']),
+        ('/schools/<int:school_id>/students/<int:student_id>/vaccinate', 'mark_vaccinated', ['POST']),
+    ],
+    'drives': [
+        ('/schools/<int:school_id>/drives/<int:drive_id>', 'single_vaccination_drive', ['GET', 'PUT', 'DELETE']),
+        ('/schools/<int:school_id>/drives', 'manage_vaccination_drives', ['GET', 'POST']),
+    ],
+    'analytics': [
+        ('/schools/<int:school_id>/analytics/coverage', 'get_coverage', ['GET']),
+        ('/schools/<int:school_id>/coverage/timeseries', 'get_coverage_timeseries', ['GET']),
+        ('/district/coverage/timeseries', 'get_coverage_timeseries', ['GET']),
+    ],
+    'district': [
+        ('/district/dashboard', 'get_district_dashboard', ['GET']),
+    ],
+    'reports': [
+        ('/schools/<int:school_id>/reports/coverage', 'get_school_report', ['GET']),
+        ('/district/reports/coverage', 'get_district_report', ['GET']),
+    ],
+    'batch': [
+        ('/batch', 'run_batch', ['POST']),
+    ],
+    'internal': [
+        ('/internal/pool', 'get_pool_status', ['GET']),
+        ('/internal/statement-cache', 'get_statement_cache', ['GET']),
+        ('/internal/replicas', 'get_replica_status', ['GET']),
+        ('/internal/roster', 'get_roster_index', ['GET']),
+        ('/internal/coverage', 'get_coverage_index', ['GET']),
+        ('/internal/district', 'get_district_status', ['GET']),
+        ('/internal/slow-queries', 'get_slow_queries', ['GET']),
+        ('/internal/memory-profile', 'get_memory_profile', ['GET']),
+        ('/metrics', 'get_metrics', ['GET']),
+    ],
+}
+
+class LazyView:
+    def __init__(self, import_name):
+        self.import_name = import_name
+        self.__module__, self.__name__ = import_name.rsplit('.', 1)
+
+    @cached_property
+    def view(self):
+        return import_string(self.import_name)
+
+    def __call__(self, *args, **kwargs):
+        return self.view(*args, **kwargs)
+
+def lazy_blueprint(name, rules):
+    blueprint = Blueprint(name, __name__)
+    views = {}  # One LazyView per endpoint, which may have several rules
+    for rule, view, methods in rules:
+        if view not in views:
+            views[view] = LazyView(f'{__name__}.{name}.{view}')
+        blueprint.add_url_rule(rule, view, views[view], methods=methods)
+    return blueprint
+
+def register_blueprints(app):
+    for name, rules in ROUTES.items():
+        app.register_blueprint(lazy_blueprint(name, rules))
+
+def load_views(app):
+    for view in app.view_functions.values():
+        if isinstance(view, LazyView):
+            view.view
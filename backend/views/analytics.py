@@ -0,0 +1,86 @@
+# views/analytics.py
+from datetime import datetime, timedelta
+
+from flask import current_app, request, jsonify
+
+from coverage import FIELDS
+from helpers import _build_cors_preflight_response, is_authorized
+from models import db
+from queries import active_student_count, district_active_student_count
+from timeseries import BUCKETS
+
+SERIES_MAX_PERIODS = 1000
+
+def get_coverage(school_id):
+    if request.method == 'OPTIONS':
+        return _build_cors_preflight_response()
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+
+    # e.g. ?population=class:6 AND gender:Female&query=vaccine:MMR AND NOT vaccine:"Hepatitis B"
+    query = request.args.get('query', 'vaccinated')
+    rows = request.args.get('rows') or None
+    columns = request.args.get('columns') or None
+    for field in (rows, columns):
+        if field is not None and field not in FIELDS:
+            return jsonify({'message': f'Cross-tab fields must be one of {", ".join(FIELDS)}'}), 400
+    if columns and not rows:
+        return jsonify({'message': 'columns requires rows'}), 400
+
+    coverage = current_app.extensions['coverage_index'].get(school_id)
+    try:
+        result = coverage.coverage(
+            query,
+            population=request.args.get('population') or None,
+            include_inactive=request.args.get('include_inactive', '').lower() in ('1', 'true', 'yes'),
+            rows=rows,
+            columns=columns
+        )
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    return jsonify(result)
+
+def get_coverage_timeseries(school_id=None):
+    if request.method == 'OPTIONS':
+        return _build_cors_preflight_response()
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+
+    vaccine_name = request.args.get('vaccine')
+    bucket = request.args.get('bucket', 'day')
+    if not vaccine_name:
+        return jsonify({'message': 'vaccine is required'}), 400
+    if bucket not in BUCKETS:
+        return jsonify({'message': f'bucket must be one of {", ".join(BUCKETS)}'}), 400
+    try:
+        end = datetime.strptime(request.args['to'], '%Y-%m-%d').date() if request.args.get('to') \
+            else datetime.utcnow().date()
+        start = datetime.strptime(request.args['from'], '%Y-%m-%d').date() if request.args.get('from') \
+            else end - timedelta(days=89 if bucket == 'day' else 364)
+    except ValueError:
+        return jsonify({'message': 'from and to must be dates (YYYY-MM-DD)'}), 400
+    if start > end:
+        return jsonify({'message': 'from must not be after to'}), 400
+    if (end - start).days // (7 if bucket == 'week' else 1) >= SERIES_MAX_PERIODS:
+        return jsonify({'message': f'At most {SERIES_MAX_PERIODS} periods per request'}), 400
+
+    series = current_app.extensions['coverage_series'].series(school_id, vaccine_name, bucket, start, end)
+    if school_id is None:
+        total_students = db.session.scalar(district_active_student_count())
+    else:
+        total_students = db.session.scalar(active_student_count(school_id))
+
+    return jsonify({
+        'school_id': school_id,
+        'vaccine': vaccine_name,
+        'bucket': bucket,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'total_students': total_students,
+        'series': [{
+            'period': period.isoformat(),
+            'vaccinated': vaccinated,
+            'cumulative': cumulative,
+            'coverage_percentage': round(cumulative / total_students * 100, 2) if total_students else 0
+        } for period, vaccinated, cumulative in series]
+    })
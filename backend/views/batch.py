@@ -0,0 +1,104 @@
+# views/batch.py
+# POST /batch runs an ordered list of sub-requests through the existing views in one
+# database transaction:
+#
+#   {"atomic": true, "requests": [
+#       {"method": "POST", "path": "/schools/1/students", "body": {...}},
+#       {"method": "POST", "path": "/schools/1/students/7/vaccinate", "body": {"drive_id": 3}}
+#   ]}
+#
+# Each sub-request runs inside a SAVEPOINT and the views' own commits only flush (see
+# RoutingSession). With atomic the first failing sub-request rolls back the whole
+# batch; otherwise only the failed sub-request is rolled back and the rest commit.
+from flask import current_app, request, jsonify
+from werkzeug.exceptions import HTTPException
+
+from helpers import _build_cors_preflight_response, is_authorized
+from models import db
+
+BATCH_METHODS = ('GET', 'POST', 'PUT', 'DELETE')
+
+def run_batch():
+    if request.method == 'OPTIONS':
+        return _build_cors_preflight_response()
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+
+    data = request.get_json(silent=True) or {}
+    sub_requests = data.get('requests')
+    atomic = bool(data.get('atomic', False))
+    if not isinstance(sub_requests, list) or not sub_requests:
+        return jsonify({'message': 'requests must be a non-empty list'}), 400
+    max_requests = current_app.config['BATCH_MAX_REQUESTS']
+    if len(sub_requests) > max_requests:
+        return jsonify({'message': f'At most {max_requests} requests per batch'}), 400
+
+    session = db.session()
+    session.commit()  # Start the batch with a clean transaction
+    session.info['batch'] = True
+    connection = session.connection()
+    if connection.dialect.name == 'sqlite':
+        # pysqlite does not open a transaction before a SAVEPOINT, so releasing the
+        # first savepoint would commit it. Take the write lock up front instead.
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+    results = []
+    failed_index = None
+    try:
+        for index, sub_request in enumerate(sub_requests):
+            result = _run_sub_request(session, sub_request)
+            results.append(result)
+            if result['status'] >= 400 and atomic:
+                failed_index = index
+                break
+    except Exception:
+        session.info.pop('batch_savepoint', None)
+        session.info.pop('batch', None)
+        session.rollback()
+        raise
+
+    session.info.pop('batch', None)
+    if failed_index is not None:
+        session.rollback()
+        return jsonify({'committed': False, 'failed_index': failed_index, 'results': results}), 400
+    session.commit()
+    return jsonify({'committed': True, 'results': results})
+
+def _run_sub_request(session, sub_request):
+    if not isinstance(sub_request, dict):
+        return {'status': 400, 'body': {'message': 'Each request must be an object'}}
+    method = str(sub_request.get('method', 'GET')).upper()
+    path = sub_request.get('path')
+    if method not in BATCH_METHODS:
+        return {'status': 405, 'body': {'message': f'Method {method} is not allowed in a batch'}}
+    if not isinstance(path, str) or not path.startswith('/') or path.split('?')[0].rstrip('/') == '/batch':
+        return {'status': 400, 'body': {'message': 'Invalid path'}}
+
+    app = current_app._get_current_object()
+    kwargs = {'method': method, 'headers': {'Authorization': request.headers.get('Authorization', '')}}
+    if sub_request.get('body') is not None:
+        kwargs['json'] = sub_request['body']
+
+    savepoint = session.begin_nested()
+    session.info['batch_savepoint'] = savepoint
+    try:
+        # Shares the batch's app context, and with it db.session. Before/after request
+        # hooks are not run: metrics and profiling see the batch as one request.
+        with app.test_request_context(path, **kwargs):
+            try:
+                response = app.make_response(app.dispatch_request())
+                status, body = response.status_code, response.get_json(silent=True)
+            except HTTPException as e:
+                status, body = e.code, {'message': e.description}
+            except Exception:
+                # Fails this sub-request only; its savepoint is rolled back below
+                current_app.logger.exception(f'Batch sub-request {method} {path} failed')
+                status, body = 500, {'message': 'Internal server error'}
+    finally:
+        session.info.pop('batch_savepoint', None)
+
+    if session.get_nested_transaction() is savepoint:
+        if status >= 400 or not savepoint.is_active:
+            savepoint.rollback()
+        else:
+            savepoint.commit()
+    return {'status': status, 'body': body}
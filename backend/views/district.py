@@ -0,0 +1,41 @@
+# views/district.py
+from flask import current_app, request, jsonify
+
+from helpers import _build_cors_preflight_response, is_authorized
+
+DISTRICT_PAGE_SIZE = 50
+DISTRICT_MAX_PAGE_SIZE = 500
+SORT_FIELDS = ('school_name', 'school_id', 'total_students', 'vaccinated_students', 'vaccinated_percentage',
+               'upcoming_drives')
+
+def get_district_dashboard():
+    if request.method == 'OPTIONS':
+        return _build_cors_preflight_response()
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+
+    sort = request.args.get('sort', 'school_name')
+    order = request.args.get('order', 'asc')
+    page = request.args.get('page', 1, type=int)
+    page_size = request.args.get('page_size', DISTRICT_PAGE_SIZE, type=int)
+    if sort not in SORT_FIELDS:
+        return jsonify({'message': f'sort must be one of {", ".join(SORT_FIELDS)}'}), 400
+    if order not in ('asc', 'desc'):
+        return jsonify({'message': 'order must be asc or desc'}), 400
+    if not page or page < 1 or not page_size or not 1 <= page_size <= DISTRICT_MAX_PAGE_SIZE:
+        return jsonify({'message': f'page must be positive and page_size between 1 and {DISTRICT_MAX_PAGE_SIZE}'}), 400
+
+    rollup = current_app.extensions['district_dashboard'].rollup()
+    # Ties keep school_id order, so pages do not shift between requests
+    schools = sorted(rollup.schools.values(), key=lambda row: row['school_id'])
+    schools.sort(key=lambda row: row[sort], reverse=order == 'desc')
+    start = (page - 1) * page_size
+
+    return jsonify({
+        'totals': rollup.totals,
+        'schools': schools[start:start + page_size],
+        'page': page,
+        'page_size': page_size,
+        'total_schools': len(schools),
+        'generated_at': rollup.generated_at.isoformat()
+    })
@@ -0,0 +1,107 @@
+# views/drives.py
+from datetime import datetime, timedelta
+
+from flask import current_app, request, jsonify
+
+from helpers import (_build_cors_preflight_response, is_authorized, encode_sync_token, decode_sync_token,
+                     include_archived)
+from models import db, VaccinationDrive, DeletedDrive, Vaccination
+from queries import (drive_list_statement, drive_changes_statement, serialize_drive_list, drive_by_id,
+                     archived_drive_list_statement, archived_drive_by_id, drives_removed_since)
+
+def single_vaccination_drive(school_id, drive_id):
+    if request.method == 'OPTIONS':
+        return _build_cors_preflight_response()
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+
+    if request.method == 'GET' and include_archived(request):
+        drive = db.session.execute(drive_by_id(school_id, drive_id)).scalars().first() or \
+            db.first_or_404(archived_drive_by_id(school_id, drive_id))
+    else:
+        drive = db.first_or_404(drive_by_id(school_id, drive_id))
+
+    if request.method == 'GET':
+        return jsonify({
+            'drive_id': drive.drive_id,
+            'drive_date': drive.drive_date.isoformat(),
+            'vaccine_name': drive.vaccine_name,
+            'available_doses': drive.available_doses,
+            'applicable_classes': drive.applicable_classes,
+            'school_id': drive.school_id
+        })
+    
+    elif request.method == 'PUT':
+        data = request.get_json()
+        if 'drive_date' in data:
+            drive.drive_date = datetime.strptime(data['drive_date'], '%Y-%m-%d').date()
+        if 'vaccine_name' in data:
+            drive.vaccine_name = data['vaccine_name']
+        if 'available_doses' in data:
+            drive.available_doses = data['available_doses']
+        if 'applicable_classes' in data:
+            drive.applicable_classes = data['applicable_classes']
+        
+        db.session.commit()
+        return jsonify({
+            'drive_id': drive.drive_id,
+            'vaccine_name': drive.vaccine_name,
+            'drive_date': drive.drive_date.isoformat()
+        })
+    
+    elif request.method == 'DELETE':
+        # Check if there are any vaccinations associated with this drive
+        vaccinations = Vaccination.query.filter_by(drive_id=drive_id).count()
+        if vaccinations > 0:
+            return jsonify({
+                'message': 'Cannot delete drive with existing vaccinations',
+                'vaccination_count': vaccinations
+            }), 400
+        
+        db.session.delete(drive)
+        db.session.add(DeletedDrive(drive_id=drive.drive_id, school_id=drive.school_id))
+        db.session.commit()
+        return jsonify({'message': 'Vaccination drive deleted successfully'}), 200
+
+def manage_vaccination_drives(school_id):
+    if request.method == 'OPTIONS':
+        return _build_cors_preflight_response()
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+    
+    if request.method == 'GET':
+        sync_token = encode_sync_token(datetime.utcnow())
+        if 'updated_since' in request.args:
+            since = decode_sync_token(request.args['updated_since'])
+            if since is None:
+                return jsonify({'message': 'Invalid sync token'}), 400
+            since -= timedelta(seconds=current_app.config['SYNC_OVERLAP_SECONDS'])
+            return jsonify({
+                'drives': serialize_drive_list(db.session.execute(drive_changes_statement(school_id, since))),
+                'deleted': db.session.execute(drives_removed_since(school_id, since)).scalars().all(),
+                'sync_token': sync_token
+            })
+
+        statement = drive_list_statement(school_id)
+        if include_archived(request):
+            statement = statement.union_all(archived_drive_list_statement(school_id))
+        response = jsonify(serialize_drive_list(db.session.execute(statement)))
+        response.headers['X-Sync-Token'] = sync_token
+        return response
+    
+    elif request.method == 'POST':
+        data = request.get_json()
+        new_drive = VaccinationDrive(
+            school_id=school_id,
+            drive_date=datetime.strptime(data['drive_date'], '%Y-%m-%d').date(),
+            vaccine_name=data['vaccine_name'],
+            available_doses=data['available_doses'],
+            applicable_classes=data['applicable_classes']
+        )
+        db.session.add(new_drive)
+        db.session.commit()
+        return jsonify({
+            'drive_id': new_drive.drive_id,
+            'vaccine_name': new_drive.vaccine_name,
+            'school_id': new_drive.school_id  # Added school_id to response
+        }), 201
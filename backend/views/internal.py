@@ -0,0 +1,69 @@
+# views/internal.py
+from flask import current_app, request, jsonify, Response
+
+from db_pool import pool_status
+from metrics import statement_cache_status
+from helpers import is_authorized
+from models import db
+
+def get_pool_status():
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+
+    return jsonify(pool_status(db.engine))
+
+def get_statement_cache():
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+
+    return jsonify(statement_cache_status(db.engine))
+
+def get_replica_status():
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+
+    return jsonify(current_app.extensions['replica_router'].status())
+
+def get_roster_index():
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+
+    return jsonify(current_app.extensions['roster_index'].status())
+
+def get_coverage_index():
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+
+    return jsonify(dict(current_app.extensions['coverage_index'].status(),
+                        series=current_app.extensions['coverage_series'].status()))
+
+def get_district_status():
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+
+    return jsonify(current_app.extensions['district_dashboard'].status())
+
+def get_slow_queries():
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+
+    slow_query_log = current_app.extensions['slow_query_log']
+    return jsonify({
+        'enabled': slow_query_log.enabled,
+        'threshold_ms': current_app.config['SLOW_QUERY_THRESHOLD_MS'],
+        'queries': slow_query_log.recent()
+    })
+
+def get_memory_profile():
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+
+    memory_profiler = current_app.extensions['memory_profiler']
+    return jsonify({
+        'enabled': memory_profiler.enabled,
+        'requests': memory_profiler.recent()
+    })
+
+def get_metrics():
+    request_metrics = current_app.extensions['request_metrics']
+    return Response(request_metrics.render(), mimetype='text/plain; version=0.0.4')
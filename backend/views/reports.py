@@ -0,0 +1,64 @@
+# views/reports.py
+# Coverage reports read from the reporting tables (reporting.py), not the live tables.
+# `as_of` is the watermark of the last refresh: later changes are not included yet.
+from datetime import datetime
+
+from flask import request, jsonify
+
+from helpers import _build_cors_preflight_response, is_authorized
+from models import db
+from queries import latest_report_refresh, school_report_statements, district_report_statements
+
+def get_school_report(school_id):
+    return _coverage_report(lambda start, end: school_report_statements(school_id, start, end),
+                            'student_class', 'classes', school_id=school_id)
+
+def get_district_report():
+    return _coverage_report(district_report_statements, 'school_id', 'schools')
+
+def _coverage_report(statements, group, rows_key, **report):
+    if request.method == 'OPTIONS':
+        return _build_cors_preflight_response()
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+
+    try:
+        start = datetime.strptime(request.args['from'], '%Y-%m-%d').date() if request.args.get('from') else None
+        end = datetime.strptime(request.args['to'], '%Y-%m-%d').date() if request.args.get('to') else None
+    except ValueError:
+        return jsonify({'message': 'from and to must be dates (YYYY-MM-DD)'}), 400
+
+    refresh = db.session.execute(latest_report_refresh()).scalar()
+    if refresh is None:
+        return jsonify({'message': 'Reports have not been generated yet'}), 503
+
+    students_stmt, vaccinations_stmt = statements(start, end)
+    vaccinations = {}
+    for key, vaccine_name, vaccinated in db.session.execute(vaccinations_stmt):
+        vaccinations.setdefault(key, {})[vaccine_name] = int(vaccinated)
+
+    rows, totals = [], {'active_students': 0, 'vaccinated_students': 0, 'vaccinations': {}}
+    for key, active_students, vaccinated_students in db.session.execute(students_stmt):
+        active_students, vaccinated_students = int(active_students), int(vaccinated_students)
+        rows.append({
+            group: key,
+            'active_students': active_students,
+            'vaccinated_students': vaccinated_students,
+            'vaccinated_percentage': round((vaccinated_students / active_students) * 100, 2) if active_students else 0,
+            'vaccinations': vaccinations.get(key, {})
+        })
+        totals['active_students'] += active_students
+        totals['vaccinated_students'] += vaccinated_students
+        for vaccine_name, vaccinated in vaccinations.get(key, {}).items():
+            totals['vaccinations'][vaccine_name] = totals['vaccinations'].get(vaccine_name, 0) + vaccinated
+    totals['vaccinated_percentage'] = round((totals['vaccinated_students'] / totals['active_students']) * 100, 2) \
+        if totals['active_students'] else 0
+
+    report.update({
+        'as_of': refresh.watermark.isoformat(),
+        'from': start.isoformat() if start else None,
+        'to': end.isoformat() if end else None,
+        rows_key: rows,
+        'totals': totals
+    })
+    return jsonify(report)
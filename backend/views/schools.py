@@ -0,0 +1,158 @@
+# views/schools.py
+from datetime import datetime
+
+from dateutil.relativedelta import relativedelta
+from flask import current_app, request, jsonify
+
+from helpers import _build_cors_preflight_response, is_authorized, encode_sync_token, AUTHORIZED_TOKEN
+from models import db, School
+from queries import (active_student_count, vaccinated_student_count, upcoming_drives, active_drives_statement,
+                     serialize_drive_list, student_page_statement, student_vaccinations_statement,
+                     serialize_student_list)
+
+WORKSPACE_PAGE_SIZE = 50
+WORKSPACE_MAX_PAGE_SIZE = 500
+
+def get_dashboard_data_count(school_id):
+    try:
+        # Total Number of Students in the School
+        total_students = db.session.scalar(active_student_count(school_id))
+
+        # Number of Vaccinated Students
+        vaccinated_students = db.session.scalar(vaccinated_student_count(school_id))
+
+        # Percentage of Vaccinated Students
+        vaccinated_percentage = round((vaccinated_students / total_students) * 100, 2) if total_students else 0
+
+        # Upcoming Vaccination Drives (within the next 30 days)
+        today = datetime.now().date()
+        future_date = today + relativedelta(days=30)
+        upcoming = db.session.execute(upcoming_drives(school_id, today, future_date))
+
+        # Convert the drives to a serializable format
+        upcoming_drives_data = [
+            {
+                'drive_id': drive.drive_id,
+                'drive_date': drive.drive_date.isoformat(),
+                'vaccine_name': drive.vaccine_name,
+                'available_doses': drive.available_doses,
+                'applicable_classes': drive.applicable_classes
+            }
+            for drive in upcoming
+        ]
+
+        return {
+            'total_students': total_students,
+            'vaccinated_students': vaccinated_students,
+            'vaccinated_percentage': vaccinated_percentage,
+            'upcoming_drives': upcoming_drives_data,
+        }
+
+    except Exception as e:
+        current_app.logger.error(f"Error in get_dashboard_data: {e}")
+        return None
+
+def login():
+    if request.method == 'OPTIONS':
+        return _build_cors_preflight_response()
+    return jsonify({'token': AUTHORIZED_TOKEN})
+
+def get_dashboard_data(school_id):
+    if request.method == 'OPTIONS':
+        return _build_cors_preflight_response()
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+    
+    dashboard_data = get_dashboard_data_count(school_id)
+    if dashboard_data:
+        return jsonify(dashboard_data), 200
+    return jsonify({'error': 'Failed to retrieve dashboard data'}), 500
+
+def manage_schools():
+    if request.method == 'OPTIONS':
+        return _build_cors_preflight_response()
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+    
+    if request.method == 'GET':
+        schools = School.query.all()
+        return jsonify([{
+            'school_id': s.school_id,
+            'school_name': s.school_name,
+            'classes': s.classes
+        } for s in schools])
+    
+    elif request.method == 'POST':
+        data = request.get_json()
+        new_school = School(
+            school_name=data['school_name'],
+            classes=data.get('classes', '')
+        )
+        db.session.add(new_school)
+        db.session.commit()
+        return jsonify({
+            'school_id': new_school.school_id,
+            'school_name': new_school.school_name
+        }), 201
+
+def single_school(school_id):
+    if request.method == 'OPTIONS':
+        return _build_cors_preflight_response()
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+
+    school = School.query.get_or_404(school_id)
+
+    if request.method == 'GET':
+        return jsonify({
+            'school_id': school.school_id,
+            'school_name': school.school_name,
+            'classes': school.classes
+        })
+    
+    elif request.method == 'PUT':
+        data = request.get_json()
+        if 'school_name' in data:
+            school.school_name = data['school_name']
+        if 'classes' in data:
+            school.classes = data['classes']
+        
+        db.session.commit()
+        return jsonify({
+            'school_id': school.school_id,
+            'school_name': school.school_name,
+            'classes': school.classes
+        })
+
+def get_workspace(school_id):
+    if request.method == 'OPTIONS':
+        return _build_cors_preflight_response()
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+
+    page_size = min(request.args.get('page_size', WORKSPACE_PAGE_SIZE, type=int), WORKSPACE_MAX_PAGE_SIZE)
+    if page_size < 1:
+        return jsonify({'message': 'page_size must be positive'}), 400
+
+    # Every read below runs in one transaction on one bind: the session pins the replica
+    # it picks (routing.py). On MySQL's REPEATABLE READ that is one consistent snapshot.
+    sync_token = encode_sync_token(datetime.utcnow())
+    school = db.get_or_404(School, school_id)
+    drives = db.session.execute(active_drives_statement(school_id, datetime.now().date()))
+    student_count = db.session.scalar(active_student_count(school_id))
+    student_rows = db.session.execute(student_page_statement(school_id, page_size)).all()
+    vaccination_rows = db.session.execute(student_vaccinations_statement([row.student_id for row in student_rows]))
+
+    return jsonify({
+        'school': {
+            'school_id': school.school_id,
+            'school_name': school.school_name,
+            'classes': school.classes
+        },
+        'classes': [c for c in (school.classes or '').split(',') if c],
+        'drives': serialize_drive_list(drives),
+        'students': serialize_student_list(student_rows, vaccination_rows),
+        'student_count': student_count,
+        'next_after': student_rows[-1].student_id if len(student_rows) == page_size else None,
+        'sync_token': sync_token
+    })
@@ -0,0 +1,348 @@
+# views/students.py
+import csv
+from datetime import datetime, timedelta
+from io import TextIOWrapper
+
+from flask import current_app, request, jsonify
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from helpers import (_build_cors_preflight_response, is_authorized, encode_sync_token, decode_sync_token,
+                     include_archived)
+from models import db, Student, Vaccination
+from queries import (student_list_statements, student_changes_statements, serialize_student_list,
+                     student_page_statement, student_vaccinations_statement, student_facet_statements,
+                     vaccination_records_statement, student_by_id, drive_by_id, existing_vaccination,
+                     archived_student_by_id, archived_student_vaccinations, archived_students_since)
+
+BATCH_MAX_IDS = 500
+
+def manage_students(school_id):
+    if request.method == 'OPTIONS':
+        return _build_cors_preflight_response()
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+
+    if request.method == 'GET':
+        # Get query parameters for filtering
+        if 'updated_since' in request.args:
+            return _student_changes(school_id, request.args['updated_since'])
+
+        search = request.args.get('search', '')
+        student_class = request.args.get('class', '')
+        vaccination_status = request.args.get('vaccination_status', '')
+
+        roster = current_app.extensions['roster_index'].get(school_id) if 'limit' not in request.args else None
+        if roster is not None:
+            response = jsonify(roster.student_list(search, student_class, vaccination_status))
+            response.headers['X-Sync-Token'] = encode_sync_token(roster.synced_at)
+            return response
+        sync_token = encode_sync_token(datetime.utcnow())
+
+        # Plain row tuples: no Student/Vaccination instances for a read-only list
+        if 'limit' in request.args:
+            # One page ordered by id; the next page starts after the last id returned
+            limit = request.args.get('limit', type=int)
+            if not limit or limit < 1:
+                return jsonify({'message': 'limit must be a positive integer'}), 400
+            student_rows = db.session.execute(student_page_statement(
+                school_id, limit, request.args.get('after', 0, type=int), search, student_class
+            )).all()
+            vaccination_rows = db.session.execute(
+                student_vaccinations_statement([row.student_id for row in student_rows]))
+        else:
+            students_stmt, vaccinations_stmt = student_list_statements(school_id, search, student_class)
+            student_rows = db.session.execute(students_stmt).all()
+            vaccination_rows = db.session.execute(vaccinations_stmt)
+        response = jsonify(serialize_student_list(student_rows, vaccination_rows, vaccination_status))
+        response.headers['X-Sync-Token'] = sync_token
+        return response
+    
+    elif request.method == 'POST':
+        data = request.get_json()
+        new_student = Student(
+            school_id=school_id,
+            first_name=data['first_name'],
+            last_name=data['last_name'],
+            date_of_birth=datetime.strptime(data['date_of_birth'], '%Y-%m-%d').date() if data.get('date_of_birth') else None,
+            gender=data.get('gender'),
+            contact_number=data.get('contact_number'),
+            student_class=data['student_class']
+        )
+        db.session.add(new_student)
+        db.session.commit()
+        return jsonify({
+            'student_id': new_student.student_id,
+            'first_name': new_student.first_name,
+            'last_name': new_student.last_name
+        }), 201
+
+def _student_changes(school_id, token):
+    since = decode_sync_token(token)
+    if since is None:
+        return jsonify({'message': 'Invalid sync token'}), 400
+    since -= timedelta(seconds=current_app.config['SYNC_OVERLAP_SECONDS'])
+    sync_token = encode_sync_token(datetime.utcnow())
+
+    students_stmt, vaccinations_stmt = student_changes_statements(school_id, since)
+    student_rows = db.session.execute(students_stmt).all()
+    active_rows = [row[:-1] for row in student_rows if row.is_active]
+    return jsonify({
+        'students': serialize_student_list(active_rows, db.session.execute(vaccinations_stmt)),
+        'deactivated': [row.student_id for row in student_rows if not row.is_active] +
+                       db.session.execute(archived_students_since(school_id, since)).scalars().all(),
+        'sync_token': sync_token
+    })
+
+def get_student_facets(school_id):
+    if request.method == 'OPTIONS':
+        return _build_cors_preflight_response()
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+
+    search = request.args.get('search', '')
+    student_class = request.args.get('class', '')
+    vaccination_status = request.args.get('vaccination_status', '')
+    roster = current_app.extensions['roster_index'].get(school_id)
+    if roster is not None:
+        return jsonify(roster.facets(search, student_class, vaccination_status))
+
+    classes_stmt, vaccines_stmt, status_stmt = student_facet_statements(
+        school_id, search, student_class, vaccination_status)
+    classes = {student_class: count for student_class, count in db.session.execute(classes_stmt)}
+    vaccines = {vaccine_name: count for vaccine_name, count in db.session.execute(vaccines_stmt)}
+    total, vaccinated = db.session.execute(status_stmt).one()
+    status_counts = {'vaccinated': vaccinated, 'not_vaccinated': total - vaccinated}
+
+    return jsonify({
+        'total': status_counts.get(vaccination_status, total),
+        'classes': classes,
+        'vaccines': vaccines,
+        'vaccination_status': status_counts
+    })
+
+def get_students_vaccinations(school_id):
+    if request.method == 'OPTIONS':
+        return _build_cors_preflight_response()
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+
+    try:
+        student_ids = sorted({int(i) for i in request.args.get('ids', '').split(',') if i.strip()})
+    except ValueError:
+        return jsonify({'message': 'ids must be a comma-separated list of student IDs'}), 400
+    if not student_ids:
+        return jsonify({'message': 'ids is required'}), 400
+    if len(student_ids) > BATCH_MAX_IDS:
+        return jsonify({'message': f'At most {BATCH_MAX_IDS} ids per request'}), 400
+
+    found = set(db.session.scalars(
+        select(Student.student_id).where(Student.school_id == school_id, Student.student_id.in_(student_ids))
+    ))
+    vaccinations = {student_id: [] for student_id in student_ids if student_id in found}
+    for student_id, vaccination_id, drive_id, vaccine_name, vaccination_date, vaccinated_status in \
+            db.session.execute(vaccination_records_statement(school_id, student_ids)):
+        vaccinations[student_id].append({
+            'vaccination_id': vaccination_id,
+            'drive_id': drive_id,
+            'vaccine_name': vaccine_name,
+            'vaccination_date': vaccination_date.isoformat(),
+            'vaccinated_status': vaccinated_status
+        })
+
+    return jsonify({
+        'vaccinations': {str(student_id): v for student_id, v in vaccinations.items()},
+        'not_found': [student_id for student_id in student_ids if student_id not in found]
+    })
+
+def student_detail(school_id, student_id):
+    if request.method == 'OPTIONS':
+        return _build_cors_preflight_response()
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+    
+    student = db.session.execute(student_by_id(school_id, student_id)).scalars().first()
+    if not student and request.method == 'GET' and include_archived(request):
+        archived = db.session.execute(archived_student_by_id(school_id, student_id)).scalars().first()
+        if archived:
+            vaccinations = db.session.execute(archived_student_vaccinations(student_id)).scalars().all()
+            return jsonify(dict(_student_detail(archived, vaccinations), archived=True))
+    if not student:
+        return jsonify({'error': 'Student not found'}), 404
+    
+    if request.method == 'GET':
+        return jsonify(_student_detail(student, student.vaccinations))
+    
+    elif request.method == 'PUT':
+        data = request.get_json()
+        if 'first_name' in data:
+            student.first_name = data['first_name']
+        if 'last_name' in data:
+            student.last_name = data['last_name']
+        if 'date_of_birth' in data:
+            student.date_of_birth = datetime.strptime(data['date_of_birth'], '%Y-%m-%d').date() if data['date_of_birth'] else None
+        if 'gender' in data:
+            student.gender = data['gender']
+        if 'contact_number' in data:
+            student.contact_number = data['contact_number']
+        if 'student_class' in data:
+            student.student_class = data['student_class']
+        
+        db.session.commit()
+        return jsonify({
+            'student_id': student.student_id,
+            'first_name': student.first_name,
+            'last_name': student.last_name
+        })
+    
+    elif request.method == 'DELETE':
+        student.is_active = False
+        db.session.commit()
+        return jsonify({'message': 'Student deactivated'}), 200
+
+def _student_detail(student, vaccinations):
+    return {
+        'student_id': student.student_id,
+        'first_name': student.first_name,
+        'last_name': student.last_name,
+        'date_of_birth': student.date_of_birth.isoformat() if student.date_of_birth else None,
+        'gender': student.gender,
+        'contact_number': student.contact_number,
+        'student_class': student.student_class,
+        'vaccinations': [_vaccination_detail(v) for v in vaccinations]
+    }
+
+def _vaccination_detail(vaccination):
+    return {
+        'vaccination_id': vaccination.vaccination_id,
+        'drive_id': vaccination.drive_id,
+        'vaccine_name': vaccination.vaccine_name,
+        'vaccination_date': vaccination.vaccination_date.isoformat(),
+        'vaccinated_status': vaccination.vaccinated_status
+    }
+
+def bulk_upload_students(school_id):
+    if request.method == 'OPTIONS':
+        return _build_cors_preflight_response()
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+    
+    if 'file' not in request.files:
+        return jsonify({'message': 'No file part'}), 400
+    
+    file = request.files['file']
+    if not file or file.filename == '':
+        return jsonify({'message': 'No file selected'}), 400
+    
+    try:
+        csv_file = TextIOWrapper(file.stream, encoding='utf-8')
+        csv_reader = csv.DictReader(csv_file)
+        students_added = 0
+        
+        for row in csv_reader:
+            new_student = Student(
+                school_id=school_id,
+                first_name=row['first_name'],
+                last_name=row['last_name'],
+                date_of_birth=datetime.strptime(row['date_of_birth'], '%Y-%m-%d').date() if row.get('date_of_birth') else None,
+                gender=row.get('gender'),
+                contact_number=row.get('contact_number'),
+                student_class=row['student_class']
+            )
+            db.session.add(new_student)
+            students_added += 1
+        
+        db.session.commit()
+        return jsonify({
+            'message': f'Successfully added {students_added} students',
+            'count': students_added
+        }), 201
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': f'Error processing CSV: {str(e)}'}), 500
+
+def get_student_vaccinations(school_id, student_id):
+    if request.method == 'OPTIONS':
+        return _build_cors_preflight_response()
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+    
+    student = db.session.execute(student_by_id(school_id, student_id)).scalars().first()
+    if student:
+        vaccinations = Vaccination.query.filter_by(student_id=student_id).all()
+    elif include_archived(request) and \
+            db.session.execute(archived_student_by_id(school_id, student_id)).scalars().first():
+        vaccinations = db.session.execute(archived_student_vaccinations(student_id)).scalars().all()
+    else:
+        return jsonify({'message': 'Student not found'}), 404
+    
+    return jsonify([_vaccination_detail(v) for v in vaccinations])
+
+def mark_vaccinated(school_id, student_id):
+    if request.method == 'OPTIONS':
+        return _build_cors_preflight_response()
+    if not is_authorized(request):
+        return jsonify({'message': 'Unauthorized'}), 401
+    
+    data = request.get_json()
+    drive_id = data.get('drive_id')
+    
+    if not drive_id:
+        return jsonify({'message': 'Drive ID is required'}), 400
+    
+    # Verify student and drive belong to the same school
+    student = db.session.execute(student_by_id(school_id, student_id)).scalars().first()
+    drive = db.session.execute(drive_by_id(school_id, drive_id)).scalars().first()
+    
+    if not student:
+        return jsonify({'message': 'Student not found'}), 404
+    if not drive:
+        return jsonify({'message': 'Vaccination drive not found'}), 404
+    
+    # Check if student is already vaccinated with this vaccine
+    existing = db.session.execute(existing_vaccination(student_id, drive.vaccine_name)).scalars().first()
+    
+    if existing:
+        return jsonify({
+            'message': f'Student already vaccinated with {drive.vaccine_name}',
+            'existing_vaccination': {
+                'vaccination_id': existing.vaccination_id,
+                'drive_id': existing.drive_id,
+                'date': existing.vaccination_date.isoformat()
+            }
+        }), 400
+    
+    # Check if student's class is applicable for this drive
+    if drive.applicable_classes and student.student_class not in drive.applicable_classes.split(','):
+        return jsonify({
+            'message': f'Student class {student.student_class} not eligible for this drive'
+        }), 400
+    
+    # Create vaccination record
+    vaccination = Vaccination(
+        student_id=student_id,
+        drive_id=drive_id,
+        vaccine_name=drive.vaccine_name,
+        vaccinated_status=True,
+        vaccination_date=datetime.utcnow().date()
+    )
+    
+    db.session.add(vaccination)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent request recorded the same vaccine first
+        db.session.rollback()
+        return jsonify({'message': f'Student already vaccinated with {vaccination.vaccine_name}'}), 400
+    
+    return jsonify({
+        'message': 'Vaccination recorded successfully',
+        'vaccination': {
+            'vaccination_id': vaccination.vaccination_id,
+            'student_id': vaccination.student_id,
+            'drive_id': vaccination.drive_id,
+            'vaccine_name': vaccination.vaccine_name,
+            'date': vaccination.vaccination_date.isoformat()
+        }
+    }), 201